@@ -8,8 +8,33 @@ import plotly.figure_factory as ff
 import pyodbc
 import tempfile
 import os
+import shutil
 from datetime import datetime
 import base64
+import numpy as np
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# Copy-on-Write : les sélections de colonnes partagent les tampons (toujours actif à partir de pandas 3)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Dépendance optionnelle : copie de travail colonnaire sur disque
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Dépendance optionnelle : moteur SQL embarqué
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
 
 
 # Function to add background image
@@ -514,74 +539,2469 @@ def create_enhanced_sidebar_navigation():
             radioInputs[index].dispatchEvent(new Event('change', { bubbles: true }));
         }
     }
-    </script>
-    """, unsafe_allow_html=True)
-    
-    # Accueil item
-    accueil_active = "active" if page == "🏠 Accueil" else ""
-    if st.sidebar.button("🏠 Accueil", key="nav_home", use_container_width=True):
-        st.session_state['current_page'] = "🏠 Accueil"
-        st.rerun()
-    
-    # Fusion item
-    fusion_active = "active" if page == "🔀 Fusion" else ""
-    if st.sidebar.button("🔀 Fusion", key="nav_fusion", use_container_width=True):
-        st.session_state['current_page'] = "🔀 Fusion"
-        st.rerun()
-    
-    # Visualisation item
-    visualisation_active = "active" if page == "📊 Visualisation" else ""
-    if st.sidebar.button("📊 Visualisation", key="nav_viz", use_container_width=True):
-        st.session_state['current_page'] = "📊 Visualisation"
-        st.rerun()
-    
-    # Prédiction item with New badge
-    prediction_active = "active" if page == "🤖 Prédiction" else ""
-    if st.sidebar.button("🤖 Prédiction", key="nav_pred", use_container_width=True):
-        st.session_state['current_page'] = "🤖 Prédiction"
-        st.rerun()
-    
-    return page
+    </script>
+    """, unsafe_allow_html=True)
+    
+    # Accueil item
+    accueil_active = "active" if page == "🏠 Accueil" else ""
+    if st.sidebar.button("🏠 Accueil", key="nav_home", use_container_width=True):
+        st.session_state['current_page'] = "🏠 Accueil"
+        st.rerun()
+    
+    # Fusion item
+    fusion_active = "active" if page == "🔀 Fusion" else ""
+    if st.sidebar.button("🔀 Fusion", key="nav_fusion", use_container_width=True):
+        st.session_state['current_page'] = "🔀 Fusion"
+        st.rerun()
+    
+    # Visualisation item
+    visualisation_active = "active" if page == "📊 Visualisation" else ""
+    if st.sidebar.button("📊 Visualisation", key="nav_viz", use_container_width=True):
+        st.session_state['current_page'] = "📊 Visualisation"
+        st.rerun()
+    
+    # Prédiction item with New badge
+    prediction_active = "active" if page == "🤖 Prédiction" else ""
+    if st.sidebar.button("🤖 Prédiction", key="nav_pred", use_container_width=True):
+        st.session_state['current_page'] = "🤖 Prédiction"
+        st.rerun()
+    
+    return page
+
+# Nouvelle fonction pour afficher les options de filtrage améliorées
+def display_enhanced_filter_options():
+    st.sidebar.markdown("""
+    <div class="option-filtrage">
+        <div class="filtrage-titre">
+            Options de filtrage
+        </div>
+    </div>
+    
+    <script>
+    // JavaScript pour ajouter l'interactivité
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('.bouton-filtre').forEach(function(btn) {
+            btn.addEventListener('click', function() {
+                // Animation simple
+                this.style.backgroundColor = '#1E3A8A';
+                setTimeout(() => {
+                    this.style.backgroundColor = '';
+                }, 300);
+            });
+        });
+    });
+    </script>
+    """, unsafe_allow_html=True)
+    
+    # Boutons cachés pour le clicage
+    cat_filter_clicked = st.sidebar.button("Catégories", key="cat_filter", on_click=None)
+    num_filter_clicked = st.sidebar.button("Numériques", key="num_filter", on_click=None)
+    
+    # Logic for filter buttons
+    if cat_filter_clicked:
+        st.session_state["show_filter_category"] = not st.session_state["show_filter_category"]
+        st.session_state["show_filter_numeric"] = False
+        st.rerun()
+
+    if num_filter_clicked:
+        st.session_state["show_filter_numeric"] = not st.session_state["show_filter_numeric"]
+        st.session_state["show_filter_category"] = False
+        st.rerun()
+
+# ----- SECTION CONNEXIONS ACCESS -----
+
+# Délai (secondes) après lequel une connexion Access inutilisée est fermée
+ACCESS_IDLE_TIMEOUT = 300
+
+
+def access_conn_str(db_path):
+    return f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={db_path}"
+
+
+# Une connexion persistante par base, réutilisée d'un rerun à l'autre
+class AccessConnectionPool:
+    def __init__(self, idle_timeout):
+        self.idle_timeout = idle_timeout
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self, db_path):
+        self.close_idle()
+        with self._lock:
+            entry = self._connections.get(db_path)
+            if entry is None:
+                entry = {
+                    "conn": pyodbc.connect(access_conn_str(db_path)),
+                    "lock": threading.Lock(),
+                    "last_used": time.monotonic(),
+                }
+                self._connections[db_path] = entry
+
+        # Une connexion pyodbc ne doit servir qu'à un thread à la fois
+        with entry["lock"]:
+            try:
+                yield entry["conn"]
+            finally:
+                entry["last_used"] = time.monotonic()
+
+    def close_idle(self):
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            for db_path, entry in list(self._connections.items()):
+                if entry["last_used"] < deadline and entry["lock"].acquire(blocking=False):
+                    del self._connections[db_path]
+                    entry["conn"].close()
+                    entry["lock"].release()
+
+    def close(self, db_path):
+        with self._lock:
+            entry = self._connections.pop(db_path, None)
+        if entry is not None:
+            with entry["lock"]:
+                entry["conn"].close()
+
+
+@st.cache_resource
+def get_access_pool():
+    return AccessConnectionPool(ACCESS_IDLE_TIMEOUT)
+
+
+# Fichier .accdb temporaire d'une session : supprimé quand la session est libérée
+class AccessSessionFile:
+    def __init__(self, db_path, pool):
+        self.db_path = db_path
+        self._finalizer = weakref.finalize(self, release_access_db, pool, db_path)
+
+    def release(self):
+        self._finalizer()
+
+
+def release_access_db(pool, db_path):
+    pool.close(db_path)
+    try:
+        os.remove(db_path)
+    except OSError:
+        pass
+
+
+def list_access_tables(db_path):
+    with get_access_pool().connection(db_path) as conn:
+        return [table.table_name for table in conn.cursor().tables(tableType="TABLE")]
+
+
+# Types Access traités comme numériques (curseurs) ou texte (listes de valeurs)
+ACCESS_NUMERIC_TYPES = {
+    "BYTE", "SMALLINT", "INTEGER", "COUNTER", "BIGINT", "REAL", "FLOAT", "DOUBLE",
+    "CURRENCY", "DECIMAL", "NUMERIC",
+}
+ACCESS_TEXT_TYPES = {"CHAR", "VARCHAR", "WCHAR", "WVARCHAR", "TEXT"}
+# Types utilisables dans un ORDER BY (les champs Mémo et OLE ne le sont pas)
+ACCESS_ORDER_TYPES = ACCESS_NUMERIC_TYPES | ACCESS_TEXT_TYPES | {"DATETIME", "BIT", "GUID"}
+ACCESS_DISTINCT_LIMIT = 1000
+
+
+def quote_identifier(name):
+    return "[" + str(name).replace("]", "]]") + "]"
+
+
+# Valeur numpy -> valeur Python, pour les paramètres des requêtes
+def to_python_value(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+# Clauses WHERE (IN / BETWEEN) communes aux requêtes Access et DuckDB
+def build_filter_clauses(category_filters, numeric_filters, quote):
+    clauses = []
+    params = []
+
+    for col, values in (category_filters or {}).items():
+        if values:
+            placeholders = ", ".join("?" for _ in values)
+            clauses.append(f"{quote(col)} IN ({placeholders})")
+            params.extend(to_python_value(value) for value in values)
+
+    for col, (low, high) in (numeric_filters or {}).items():
+        clauses.append(f"{quote(col)} BETWEEN ? AND ?")
+        params.extend([low, high])
+
+    return clauses, params
+
+
+# SELECT <colonnes> FROM [table] WHERE <filtres> ORDER BY <tri>, avec des paramètres pyodbc (?)
+def build_access_query(table, columns=None, category_filters=None, numeric_filters=None, order_by=None):
+    select = ", ".join(quote_identifier(col) for col in columns) if columns else "*"
+    clauses, params = build_filter_clauses(category_filters, numeric_filters, quote_identifier)
+
+    sql = f"SELECT {select} FROM {quote_identifier(table)}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if order_by:
+        sql += " ORDER BY " + ", ".join(quote_identifier(col) for col in order_by)
+    return sql, tuple(params)
+
+
+# Colonnes d'une table (nom, type) lues dans le catalogue, sans charger de lignes
+@st.cache_data(ttl=3600)
+def get_access_columns(db_path, table, mtime):
+    with get_access_pool().connection(db_path) as conn:
+        return [
+            (row.column_name, row.type_name.upper())
+            for row in conn.cursor().columns(table=table)
+        ]
+
+
+# Valeurs distinctes (au plus ACCESS_DISTINCT_LIMIT) et indicateur de liste tronquée
+@st.cache_data(ttl=3600)
+def get_access_distinct(db_path, table, column, mtime):
+    sql = f"SELECT DISTINCT {quote_identifier(column)} FROM {quote_identifier(table)}"
+    with get_access_pool().connection(db_path) as conn:
+        rows = conn.cursor().execute(sql).fetchmany(ACCESS_DISTINCT_LIMIT + 1)
+    truncated = len(rows) > ACCESS_DISTINCT_LIMIT
+    return [row[0] for row in rows[:ACCESS_DISTINCT_LIMIT] if row[0] is not None], truncated
+
+
+@st.cache_data(ttl=3600)
+def get_access_range(db_path, table, column, mtime):
+    col = quote_identifier(column)
+    sql = f"SELECT MIN({col}), MAX({col}) FROM {quote_identifier(table)}"
+    with get_access_pool().connection(db_path) as conn:
+        return tuple(conn.cursor().execute(sql).fetchone())
+
+
+# Résultats déjà lus, invalidés dès que le fichier de la base change (mtime)
+@st.cache_resource(max_entries=16, ttl=3600)
+def load_access_query(db_path, sql, params, mtime):
+    with get_access_pool().connection(db_path) as conn:
+        return pd.read_sql(sql, conn, params=list(params) or None)
+
+
+def read_access_table(db_path, table, columns=None, category_filters=None, numeric_filters=None, order_by=None):
+    sql, params = build_access_query(table, columns, category_filters, numeric_filters, order_by)
+    return load_access_query(db_path, sql, params, os.path.getmtime(db_path))
+
+
+# ----- SECTION CHARGEMENT DES DONNÉES -----
+
+# Mémoire maximale occupée par les jeux de données partagés entre les sessions
+DATASET_CACHE_MAX_BYTES = 4 * 1024 ** 3
+
+
+# Estimation de la mémoire occupée par un objet mis en cache
+def estimate_nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, DatasetView):
+        return value.nbytes
+    if isinstance(value, SortedIndex):
+        return value.order.nbytes + value.sorted_values.nbytes
+    if isinstance(value, DatasetProfile):
+        return value.nbytes
+    return 0
+
+
+# Cache LRU partagé entre les reruns et les sessions, borné en octets
+class DatasetCache:
+    def __init__(self, max_bytes, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.current_bytes += nbytes
+            # Évincer les entrées les moins récemment utilisées (on garde toujours la dernière)
+            while len(self._entries) > 1 and (
+                self.current_bytes > self.max_bytes
+                or (self.max_entries is not None and len(self._entries) > self.max_entries)
+            ):
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+
+    def get_or_load(self, key, loader):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        # Un seul chargement par clé, même si plusieurs analystes ouvrent le même fichier
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                value = self.get(key)
+                if value is None:
+                    value = loader()
+                    self.put(key, value, estimate_nbytes(value))
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+        return value
+
+
+@st.cache_resource
+def get_dataset_cache():
+    return DatasetCache(DATASET_CACHE_MAX_BYTES)
+
+
+# Empreinte du contenu d'un fichier téléversé (calculée une seule fois par téléversement)
+def get_upload_hash(uploaded_file):
+    upload_id = getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+    upload_hashes = st.session_state.setdefault("upload_hashes", {})
+    if upload_id not in upload_hashes:
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(uploaded_file.getbuffer())
+        upload_hashes.clear()
+        upload_hashes[upload_id] = hasher.hexdigest()
+    return upload_hashes[upload_id]
+
+
+# Clé du jeu de données : empreinte du contenu + options de lecture
+def build_dataset_key(content_hash, parse_options):
+    options = repr(sorted(parse_options.items()))
+    return hashlib.blake2b(f"{content_hash}|{options}".encode(), digest_size=20).hexdigest()
+
+
+# Paramètres de l'import optimisé des fichiers CSV
+CSV_SAMPLE_ROWS = 50_000
+CSV_CHUNK_ROWS = 500_000
+CATEGORY_MAX_RATIO = 0.5  # Proportion maximale de valeurs distinctes pour passer en "category"
+
+
+def is_text_column(series):
+    return series.dtype == object or pd.api.types.is_string_dtype(series.dtype)
+
+
+# Réduit chaque colonne numérique à la plus petite largeur qui conserve toutes les valeurs
+def downcast_numeric(df):
+    for col in df.select_dtypes(include="integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in df.select_dtypes(include="floating").columns:
+        compact = df[col].astype("float32")
+        if compact.astype(df[col].dtype).equals(df[col]):
+            df[col] = compact
+    return df
+
+
+# Colonnes texte à faible cardinalité (d'après l'échantillon) à lire directement en "category"
+def infer_category_columns(sample):
+    category_columns = []
+    for col in sample.columns:
+        values = sample[col].dropna()
+        if is_text_column(sample[col]) and len(values) > 0:
+            if values.nunique() / len(values) <= CATEGORY_MAX_RATIO:
+                category_columns.append(col)
+    return category_columns
+
+
+# Lecture en flux : schéma inféré sur un échantillon, puis morceaux compactés un par un
+def read_csv_optimized(source, chunk_rows=CSV_CHUNK_ROWS, sample_rows=CSV_SAMPLE_ROWS):
+    sample = pd.read_csv(source, nrows=sample_rows)
+    source.seek(0)
+    category_columns = infer_category_columns(sample)
+    bytes_per_row = sample.memory_usage(index=True, deep=True).sum() / max(len(sample), 1)
+
+    chunks = []
+    reader = pd.read_csv(
+        source,
+        chunksize=chunk_rows,
+        dtype={col: "category" for col in category_columns},
+    )
+    for chunk in reader:
+        chunks.append(downcast_numeric(chunk))
+
+    if not chunks:
+        return sample, {"rows": 0, "before_bytes": 0, "after_bytes": 0}
+
+    # Colonnes lues en nombres dans un morceau et en texte dans un autre : relues en texte,
+    # telles qu'écrites dans le fichier, plutôt que concaténées en objets int/str mélangés
+    mixed_columns = [
+        col for col in sample.columns
+        if col not in category_columns and len({is_text_column(chunk[col]) for chunk in chunks}) > 1
+    ]
+    if mixed_columns:
+        source.seek(0)
+        text_reader = pd.read_csv(source, chunksize=chunk_rows, usecols=mixed_columns, dtype=str)
+        for chunk, text_chunk in zip(chunks, text_reader, strict=True):
+            for col in mixed_columns:
+                chunk[col] = text_chunk[col]
+
+    # Les catégories diffèrent d'un morceau à l'autre : on les unifie avant de concaténer,
+    # triées pour que leur ordre ne dépende pas du découpage en morceaux
+    categoricals = {}
+    for col in category_columns:
+        try:
+            categoricals[col] = pd.api.types.union_categoricals(
+                [chunk[col] for chunk in chunks], ignore_order=True, sort_categories=True
+            )
+        except TypeError:
+            categoricals[col] = pd.Categorical(
+                pd.concat([chunk[col].astype(object) for chunk in chunks], ignore_index=True)
+            )
+
+    df = pd.concat(
+        [chunk.drop(columns=category_columns) for chunk in chunks], ignore_index=True
+    )
+    chunks.clear()
+    for col in category_columns:
+        df[col] = categoricals.pop(col)
+    df = downcast_numeric(df[sample.columns])
+
+    report = {
+        "rows": len(df),
+        "before_bytes": int(bytes_per_row * len(df)),
+        "after_bytes": estimate_nbytes(df),
+    }
+    return df, report
+
+
+# Retourne le jeu de données et, pour l'import optimisé, le rapport mémoire
+def parse_uploaded_file(uploaded_file, parse_options, db_path=None):
+    uploaded_file.seek(0)
+    file_extension = parse_options["extension"]
+
+    if file_extension == "csv":
+        if parse_options.get("optimize"):
+            df, report = read_csv_optimized(uploaded_file)
+            return {"df": df, "report": report}
+        return {"df": pd.read_csv(uploaded_file), "report": None}
+    if file_extension == "xlsx":
+        return {"df": pd.read_excel(uploaded_file), "report": None}
+    if file_extension == "accdb":
+        return {"df": read_access_table(db_path, parse_options["table"]), "report": None}
+    raise ValueError(f"Format de fichier non supporté : {file_extension}")
+
+# Répertoire local des copies de travail colonnaires (partagé par toutes les sessions)
+WORKING_COPY_DIR = os.path.join(tempfile.gettempdir(), "dataanalyzer_cache")
+# Place disque maximale des copies de travail non utilisées par une session
+WORKING_COPY_MAX_BYTES = 16 * 1024 ** 3
+
+
+# Copies de travail sur disque : celles retenues par une session sont protégées,
+# les autres sont supprimées des moins récemment utilisées aux plus récentes
+class WorkingCopyStore:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, path):
+        with self._lock:
+            self._users[path] = self._users.get(path, 0) + 1
+        try:
+            os.utime(path)  # Date d'accès pour l'ordre LRU
+        except OSError:
+            pass
+
+    # Plus aucune session : le fichier reste sur disque (réutilisable, même après un redémarrage)
+    # jusqu'à ce que evict le supprime
+    def release(self, path):
+        with self._lock:
+            self._users[path] -= 1
+            if self._users[path] == 0:
+                del self._users[path]
+
+    def evict(self, keep=None):
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".arrow")]
+        except OSError:
+            return
+        files = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            with self._lock:
+                in_use = path == keep or path in self._users
+            if not in_use and remove_file(path):
+                total -= size
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+@st.cache_resource
+def get_working_copy_store():
+    return WorkingCopyStore(WORKING_COPY_DIR, WORKING_COPY_MAX_BYTES)
+
+
+# Copie de travail retenue par une session : libérée quand elle est remplacée ou que la session disparaît
+class SessionWorkingCopy:
+    def __init__(self, path, store):
+        self.path = path
+        store.acquire(path)
+        self._finalizer = weakref.finalize(self, store.release, path)
+
+    def release(self):
+        self._finalizer()
+
+
+# Remplace les copies de travail retenues par la session sous `name` ; les précédentes sont libérées
+def hold_working_copies(name, paths):
+    previous = st.session_state.get(name, {})
+    held = {
+        path: previous[path] if path in previous else SessionWorkingCopy(path, get_working_copy_store())
+        for path in paths
+    }
+    for path, working_copy in previous.items():
+        if path not in held:
+            working_copy.release()
+    st.session_state[name] = held
+
+
+# Poignée légère vers une copie de travail Arrow, lue via memory map
+class ColumnarDataset:
+    def __init__(self, path):
+        self.path = path
+        self._table = None
+
+    @property
+    def table(self):
+        # Les buffers restent sur disque : seules les pages lues sont chargées en mémoire
+        if self._table is None:
+            self._table = pa.ipc.open_file(pa.memory_map(self.path, "r")).read_all()
+        return self._table
+
+    @property
+    def columns(self):
+        return self.table.schema.names
+
+    @property
+    def num_rows(self):
+        return self.table.num_rows
+
+    def read(self, columns=None):
+        table = self.table if columns is None else self.table.select(list(columns))
+        # split_blocks évite la consolidation : les colonnes numériques sans nulls ne sont pas copiées
+        return table.to_pandas(split_blocks=True)
+
+
+def working_copy_path(dataset_key):
+    return os.path.join(WORKING_COPY_DIR, f"{dataset_key}.arrow")
+
+
+# Écrit la copie de travail une seule fois ; l'écriture est atomique pour les sessions concurrentes.
+# Retourne None si Arrow ne sait pas représenter le DataFrame (colonne mêlant nombres et texte...)
+def write_working_copy(df, dataset_key):
+    path = working_copy_path(dataset_key)
+    if not os.path.exists(path):
+        os.makedirs(WORKING_COPY_DIR, exist_ok=True)
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return None
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+        get_working_copy_store().evict(keep=path)
+    return ColumnarDataset(path)
+
+
+# Colonnes lues à la demande dans le fichier Arrow (memory map : les colonnes numériques et texte
+# ne sont pas copiées) ; le DataFrame n'est gardé en mémoire que sans fichier Arrow
+def read_dataset_columns(dataset, df, columns=None):
+    if dataset is not None:
+        return dataset.read(columns)
+    return df if columns is None else df[list(columns)]
+
+
+def read_session_columns(columns=None):
+    return read_dataset_columns(st.session_state.get("dataset"), st.session_state.get("df"), columns)
+
+
+def has_session_data():
+    return st.session_state.get("dataset") is not None or st.session_state.get("df") is not None
+
+
+def session_columns():
+    dataset = st.session_state.get("dataset")
+    return list(dataset.columns if dataset is not None else st.session_state["df"].columns)
+
+
+def session_num_rows():
+    dataset = st.session_state.get("dataset")
+    return dataset.num_rows if dataset is not None else len(st.session_state["df"])
+
+
+# Profil du jeu de la session : les données ne sont lues que si le profil n'est pas en cache
+def get_session_profile():
+    return get_dataset_profile(
+        None, st.session_state["dataset_key"], lambda: build_profile(read_session_columns())
+    )
+
+
+# Charge un téléversement : copie de travail existante si possible, sinon lecture puis conversion
+def load_uploaded_dataset(uploaded_file, parse_options, dataset_key, db_path=None):
+    if pa is not None and os.path.exists(working_copy_path(dataset_key)):
+        return {"df": None, "report": None, "dataset": ColumnarDataset(working_copy_path(dataset_key))}
+
+    loaded = parse_uploaded_file(uploaded_file, parse_options, db_path)
+    if pa is None:
+        return {**loaded, "dataset": None}
+
+    dataset = write_working_copy(loaded["df"], dataset_key)
+    if dataset is None:
+        # Pas de copie colonnaire possible : le DataFrame reste en mémoire, comme sans pyarrow
+        return {**loaded, "dataset": None}
+    return {"df": None, "report": loaded["report"], "dataset": dataset}
+
+
+# ----- SECTION MOTEUR DE CALCUL -----
+
+# Moteurs disponibles pour le nettoyage, le filtrage et les agrégations
+ENGINES = ["pandas", "DuckDB"] if duckdb is not None else ["pandas"]
+
+
+def duckdb_quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+# Exécute une requête sur le DataFrame enregistré comme vue "dataset" (sans copie)
+def duckdb_query(df, sql, params=None):
+    con = duckdb.connect()
+    try:
+        con.register("dataset", df)
+        return con.execute(sql, params or []).df()
+    finally:
+        con.close()
+
+
+# Numérotation des lignes dans l'ordre du DataFrame (DuckDB conserve l'ordre d'insertion)
+DUCKDB_ROWID_CTE = "step0 AS (SELECT *, row_number() OVER () - 1 AS __rowid FROM dataset)"
+
+
+CLEANING_STEPS = ["dropna", "fillna", "dropduplicates", "normalize"]
+
+
+# Paramètres d'une étape entrant dans sa version (colonnes clés des doublons)
+def cleaning_step_parameters(step, cleaning_options):
+    if step == "dropduplicates" and cleaning_options.get("duplicate_subset"):
+        return (tuple(cleaning_options["duplicate_subset"]),)
+    return ()
+
+
+# Noyaux de nettoyage vectorisés : le bloc numérique est traité comme un seul tableau 2-D,
+# découpé en paquets de colonnes répartis sur un pool de threads quand la table est large
+CLEANING_BLOCK_COLUMNS = 256
+CLEANING_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def is_numpy_numeric(dtype):
+    return isinstance(dtype, np.dtype) and dtype.kind in "iuf"
+
+
+def numeric_block(frame):
+    return np.asfortranarray(frame.to_numpy(dtype="float64", na_value=np.nan, copy=True))
+
+
+def map_column_blocks(func, block, block_columns=CLEANING_BLOCK_COLUMNS):
+    slices = [slice(start, start + block_columns) for start in range(0, block.shape[1], block_columns)]
+    if len(slices) <= 1 or CLEANING_WORKERS == 1:
+        return [func(block[:, part], part) for part in slices]
+    with ThreadPoolExecutor(max_workers=CLEANING_WORKERS) as pool:
+        return list(pool.map(lambda part: func(block[:, part], part), slices))
+
+
+# Nombre de valeurs, moyenne, minimum et maximum de toutes les colonnes du bloc
+def block_statistics(block):
+    def statistics(values, _part):
+        valid = ~np.isnan(values)
+        count = valid.sum(axis=0)
+        total = np.where(valid, values, 0.0).sum(axis=0)
+        return count, total, np.fmin.reduce(values, axis=0), np.fmax.reduce(values, axis=0)
+
+    if block.shape[1] == 0:
+        empty = np.empty(0)
+        return {"count": empty, "mean": empty, "min": empty, "max": empty}
+    count, total, low, high = (
+        np.concatenate(arrays) for arrays in zip(*map_column_blocks(statistics, block), strict=True)
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    return {"count": count, "mean": mean, "min": low, "max": high}
+
+
+# Transformation affine puis remplissage, en place : valeur * multiplier + offset, NaN -> fill
+def apply_block_transforms(block, multiplier, offset, fill):
+    def transform(values, part):
+        values *= multiplier[part]
+        values += offset[part]
+        np.copyto(values, fill[part], where=np.isnan(values))
+
+    map_column_blocks(transform, block)
+    return block
+
+
+# Réduit une suite de transformations (fillna, scale) à un triplet (multiplicateur, décalage, remplissage)
+def compose_column_transforms(transforms):
+    multiplier, offset, fill = 1.0, 0.0, np.nan
+    for transform in transforms:
+        if transform[0] == "fillna":
+            if np.isnan(fill):
+                fill = transform[1]
+        elif transform[0] == "scale":
+            span = transform[2] - transform[1]
+            multiplier, offset = multiplier / span, (offset - transform[1]) / span
+            fill = (fill - transform[1]) / span
+    return multiplier, offset, fill
+
+
+# Une étape de nettoyage pandas exprimée sur une vue : masque de lignes ou transformation de colonne
+def clean_step_view(view, step, parameters=()):
+    operation = ("clean", step, *parameters)
+
+    if step == "dropna":
+        keep = np.ones(len(view), dtype=bool)
+        for col in view.columns:
+            keep &= view.column(col).notna().to_numpy()
+        return view.select(keep, *operation)
+
+    if step == "dropduplicates":
+        # Doublons trouvés par regroupement des empreintes de lignes (calculées une fois par version)
+        subset = parameters[0] if parameters else None
+        return view.select(~pd.Series(view_row_hashes(view, subset)).duplicated().to_numpy(), *operation)
+
+    # Statistiques de toutes les colonnes numériques en un seul passage vectorisé
+    numeric_cols = list(view.numeric_columns())
+    stats = block_statistics(numeric_block(view.frame(numeric_cols)))
+    transforms = {}
+    for i, col in enumerate(numeric_cols):
+        if step == "fillna" and 0 < stats["count"][i] < len(view):
+            transforms[col] = ("fillna", stats["mean"][i])
+        if step == "normalize" and stats["max"][i] > stats["min"][i]:  # Éviter la division par zéro
+            transforms[col] = ("scale", stats["min"][i], stats["max"][i])
+    return view.with_transforms(transforms, *operation)
+
+
+def clean_dataframe_pandas(df, cleaning_options):
+    view = DatasetView(df, None)
+    for step in CLEANING_STEPS:
+        if cleaning_options.get(step):
+            view = clean_step_view(view, step, cleaning_step_parameters(step, cleaning_options))
+    return view.frame()
+
+
+# Même nettoyage que clean_dataframe_pandas, traduit en une seule requête SQL
+def clean_dataframe_duckdb(df, cleaning_options):
+    columns = [duckdb_quote(col) for col in df.columns]
+    numeric_cols = [duckdb_quote(col) for col in df.select_dtypes(include="number").columns]
+    float_cols = [duckdb_quote(col) for col in df.select_dtypes(include="floating").columns]
+    # Chaque étape : (projection, clause après FROM), concaténées sans gabarit pour que les noms
+    # de colonnes (accolades comprises) ne soient jamais réinterprétés
+    steps = []
+
+    if cleaning_options.get("dropna") and columns:
+        steps.append(("SELECT *", "WHERE " + " AND ".join(f"{col} IS NOT NULL" for col in columns)))
+
+    # Les colonnes entières n'ont pas de valeurs manquantes : seules les colonnes flottantes sont remplies
+    if cleaning_options.get("fillna") and float_cols:
+        replacements = ", ".join(f"COALESCE({col}, avg({col}) OVER ()) AS {col}" for col in float_cols)
+        steps.append((f"SELECT * REPLACE ({replacements})", ""))
+
+    if cleaning_options.get("dropduplicates") and columns:
+        subset = cleaning_options.get("duplicate_subset")
+        partition = ", ".join([duckdb_quote(col) for col in subset] if subset else columns)
+        steps.append(
+            ("SELECT *", f"QUALIFY row_number() OVER (PARTITION BY {partition} ORDER BY __rowid) = 1")
+        )
+
+    if cleaning_options.get("normalize") and numeric_cols:
+        replacements = ", ".join(
+            f"CASE WHEN max({col}) OVER () > min({col}) OVER () "
+            f"THEN (CAST({col} AS DOUBLE) - min({col}) OVER ()) / (max({col}) OVER () - min({col}) OVER ()) "
+            f"ELSE {col} END AS {col}"
+            for col in numeric_cols
+        )
+        steps.append((f"SELECT * REPLACE ({replacements})", ""))
+
+    ctes = [DUCKDB_ROWID_CTE]
+    for i, (projection, clause) in enumerate(steps, start=1):
+        ctes.append(f"step{i} AS ({projection} FROM step{i - 1} {clause})")
+    result = duckdb_query(df, f"WITH {', '.join(ctes)} SELECT * FROM step{len(steps)} ORDER BY __rowid")
+
+    # Conserver l'index d'origine pour pouvoir comparer avec le chemin pandas
+    result.index = df.index[result.pop("__rowid").to_numpy()]
+    return result
+
+
+def run_cleaning_step(view, step, engine="pandas", parameters=()):
+    if engine == "DuckDB":
+        # Le résultat SQL est déjà matérialisé : il devient la base de la vue suivante
+        options = {step: True, "duplicate_subset": parameters[0] if parameters else None}
+        result = clean_dataframe_duckdb(view.frame(), options)
+        operation = ("clean", step, *parameters)
+        return DatasetView(result, derive_version(view.version, *operation), log=view.log + (operation,),
+                           owns_base=True)
+    return clean_step_view(view, step, parameters)
+
+
+# Identifiant de version dérivé : même parent + mêmes opérations = même version
+def derive_version(parent_version, *operations):
+    payload = repr((parent_version, operations)).encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+CLEANING_CACHE_ENTRIES = 16
+
+
+@st.cache_resource
+def get_cleaning_cache():
+    return DatasetCache(DATASET_CACHE_MAX_BYTES, max_entries=CLEANING_CACHE_ENTRIES)
+
+
+# Pipeline de nettoyage incrémental : chaque étape est mise en cache selon la version de son entrée,
+# donc modifier une étape ne recalcule que les étapes suivantes
+def run_cleaning_pipeline(view, cleaning_options, engine="pandas"):
+    cache = get_cleaning_cache()
+    for step in CLEANING_STEPS:
+        if not cleaning_options.get(step):
+            continue
+        parameters = cleaning_step_parameters(step, cleaning_options)
+        step_version = derive_version(view.version, "clean", step, *parameters)
+        view = cache.get_or_load(
+            (step_version, engine),
+            lambda view=view, step=step, parameters=parameters: run_cleaning_step(view, step, engine, parameters),
+        )
+    return view
+
+
+# Index inversé d'une colonne catégorielle : valeur -> lignes, en liste ou en bitmap compressé
+class BitmapIndex:
+    # Une valeur présente sur plus d'1/32 des lignes est stockée en bitmap (1 bit par ligne)
+    DENSE_RATIO = 32
+
+    def __init__(self, series):
+        self.num_rows = len(series)
+        self.num_bytes = (self.num_rows + 7) // 8
+        self._entries = {}
+
+        # Un seul tri des codes : les lignes de chaque valeur sont contiguës et déjà ordonnées
+        codes, uniques = pd.factorize(series)
+        order = np.argsort(codes, kind="stable").astype(np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        bounds = np.concatenate([[0], np.cumsum(counts)]) + np.count_nonzero(codes < 0)
+
+        for i, value in enumerate(uniques):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if len(rows) * self.DENSE_RATIO > self.num_rows:
+                mask = np.zeros(self.num_rows, dtype=bool)
+                mask[rows] = True
+                self._entries[value] = ("bitmap", np.packbits(mask))
+            else:
+                self._entries[value] = ("rows", rows.astype(np.int32 if self.num_rows < 2 ** 31 else np.int64))
+
+    # Union des valeurs sélectionnées, sous forme de bitmap compressé
+    def union(self, values):
+        bitmap = np.zeros(self.num_bytes, dtype=np.uint8)
+        sparse_rows = []
+        for value in values:
+            kind, data = self._entries.get(value, (None, None))
+            if kind == "bitmap":
+                bitmap |= data
+            elif kind == "rows":
+                sparse_rows.append(data)
+
+        if sparse_rows:
+            mask = np.zeros(self.num_rows, dtype=bool)
+            mask[np.concatenate(sparse_rows)] = True
+            bitmap |= np.packbits(mask)
+        return bitmap
+
+
+# Construit une seule fois par version du jeu de données et par colonne
+@st.cache_resource(max_entries=64)
+def get_bitmap_index(_series, version, column):
+    return BitmapIndex(_series)
+
+
+def unpack_bitmap(bitmap, num_rows):
+    return np.unpackbits(bitmap, count=num_rows).view(bool)
+
+
+# Bits d'un bitmap compressé aux positions données (ordre des bits de np.packbits)
+def bitmap_contains(bitmap, rows):
+    return ((bitmap[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+
+# Index trié d'une colonne numérique : un filtre par intervalle devient deux recherches dichotomiques
+class SortedIndex:
+    def __init__(self, series):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+        order = np.argsort(values, kind="stable")
+        sorted_values = values[order]
+
+        # np.argsort place les NaN à la fin : ils ne correspondent à aucun intervalle
+        valid = len(values) - np.count_nonzero(np.isnan(sorted_values))
+        self.order = order[:valid].astype(np.int32 if len(values) < 2 ** 31 else np.int64)
+        self.sorted_values = sorted_values[:valid]
+
+    def bounds(self, low, high):
+        start = np.searchsorted(self.sorted_values, low, side="left")
+        end = np.searchsorted(self.sorted_values, high, side="right")
+        return start, max(start, end)
+
+    def count(self, low, high):
+        start, end = self.bounds(low, high)
+        return int(end - start)
+
+    def rows(self, low, high):
+        start, end = self.bounds(low, high)
+        return self.order[start:end]
+
+
+# Environ 12 octets par ligne et par colonne : le cache est borné en octets, pas en nombre d'index
+SORTED_INDEX_MAX_BYTES = 1024 ** 3
+
+
+@st.cache_resource
+def get_sorted_index_cache():
+    return DatasetCache(SORTED_INDEX_MAX_BYTES)
+
+
+# Construit une seule fois par version du jeu de données et par colonne
+def get_sorted_index(series, version, column):
+    return get_sorted_index_cache().get_or_load((version, column), lambda: SortedIndex(series))
+
+
+# Masque booléen de tous les prédicats, évalués colonne par colonne sans DataFrame intermédiaire
+def filter_mask_pandas(df, category_filters, numeric_filters, version=None):
+    mask = np.ones(len(df), dtype=bool)
+
+    # Sans version, pas d'index réutilisable : simple balayage des colonnes
+    if version is None:
+        for col, values in category_filters.items():
+            mask &= df[col].isin(values).to_numpy()
+        for col, (low, high) in numeric_filters.items():
+            values = df[col].to_numpy()
+            mask &= (values >= low) & (values <= high)
+        return mask
+
+    # Filtres catégoriels : unions puis intersections de bitmaps
+    bitmap = None
+    for col, values in category_filters.items():
+        col_bitmap = get_bitmap_index(df[col], version, col).union(values)
+        bitmap = col_bitmap if bitmap is None else bitmap & col_bitmap
+
+    if not numeric_filters:
+        return unpack_bitmap(bitmap, len(df)) if bitmap is not None else mask
+
+    # Filtres numériques : on part de l'intervalle le plus sélectif (compté sans balayage),
+    # puis les autres prédicats ne sont vérifiés que sur ces lignes
+    indexes = {col: get_sorted_index(df[col], version, col) for col in numeric_filters}
+    first_col = min(numeric_filters, key=lambda col: indexes[col].count(*numeric_filters[col]))
+    rows = indexes[first_col].rows(*numeric_filters[first_col])
+
+    for col, (low, high) in numeric_filters.items():
+        if col != first_col:
+            values = df[col].to_numpy()[rows]
+            rows = rows[(values >= low) & (values <= high)]
+    if bitmap is not None:
+        rows = rows[bitmap_contains(bitmap, rows)]
+
+    mask[:] = False
+    mask[rows] = True
+    return mask
+
+
+# Le filtre s'exécute en SQL ; seules les positions des lignes retenues reviennent vers pandas
+def filter_mask_duckdb(df, category_filters, numeric_filters):
+    clauses, params = build_filter_clauses(category_filters, numeric_filters, duckdb_quote)
+    sql = f"WITH {DUCKDB_ROWID_CTE} SELECT __rowid FROM step0 WHERE {' AND '.join(clauses)}"
+    mask = np.zeros(len(df), dtype=bool)
+    mask[duckdb_query(df, sql, params)["__rowid"].to_numpy()] = True
+    return mask
+
+
+# Masque mis en cache par version du jeu de données et ensemble de prédicats
+@st.cache_data(max_entries=32)
+def compute_filter_mask(_df, version, plan_key, _plan, engine):
+    if engine == "DuckDB":
+        return filter_mask_duckdb(_df, _plan.category_filters, _plan.numeric_filters)
+    return filter_mask_pandas(_df, _plan.category_filters, _plan.numeric_filters, version)
+
+
+# Plan de filtrage : regroupe les prédicats actifs et ne matérialise les lignes qu'une fois
+class FilterPlan:
+    def __init__(self, category_filters=None, numeric_filters=None):
+        self.category_filters = {
+            col: list(values) for col, values in (category_filters or {}).items() if len(values) > 0
+        }
+        self.numeric_filters = {
+            col: (float(low), float(high)) for col, (low, high) in (numeric_filters or {}).items()
+        }
+
+    def is_empty(self):
+        return not self.category_filters and not self.numeric_filters
+
+    def columns(self):
+        return list(dict.fromkeys([*self.category_filters, *self.numeric_filters]))
+
+    # Clé indépendante de l'ordre de saisie des filtres
+    def key(self):
+        categories = tuple(sorted(
+            (str(col), tuple(sorted(str(value) for value in values)))
+            for col, values in self.category_filters.items()
+        ))
+        ranges = tuple(sorted((str(col), bounds) for col, bounds in self.numeric_filters.items()))
+        return categories, ranges
+
+    def with_category_filters(self, category_filters):
+        return FilterPlan(category_filters, self.numeric_filters)
+
+    def with_numeric_filters(self, numeric_filters):
+        return FilterPlan(self.category_filters, numeric_filters)
+
+    def mask(self, df, version, engine="pandas"):
+        return compute_filter_mask(df, version, self.key(), self, engine)
+
+    # Application sans copie : le résultat est une vue (positions des lignes retenues)
+    def apply_view(self, view, engine="pandas"):
+        if self.is_empty():
+            return view
+        if view.rows is None and not view.transforms:
+            mask = self.mask(view.base, view.version, engine)
+        else:
+            mask = self.mask(view.frame(list(self.columns())), view.version, engine)
+        return view.select(np.asarray(mask), self.key())
+
+
+# Comptage des valeurs d'une colonne (équivalent de value_counts)
+def engine_value_counts(df, column, engine="pandas"):
+    if engine == "DuckDB":
+        col = duckdb_quote(column)
+        result = duckdb_query(
+            df,
+            f"SELECT {col}, count(*) AS count FROM dataset WHERE {col} IS NOT NULL "
+            f"GROUP BY {col} ORDER BY count DESC",
+        )
+        return result.set_index(column)["count"]
+    return df[column].value_counts()
+
+
+# Agrégation par catégorie (somme, moyenne ou nombre) pour les graphiques
+def engine_group_aggregate(df, x, y_columns, agg, engine="pandas"):
+    if engine == "DuckDB":
+        group = duckdb_quote(x)
+        aggregates = ", ".join(f"{agg}({duckdb_quote(y)}) AS {duckdb_quote(y)}" for y in y_columns)
+        result = duckdb_query(
+            df,
+            f"SELECT {group}, {aggregates} FROM dataset WHERE {group} IS NOT NULL "
+            f"GROUP BY {group} ORDER BY {group}",
+        )
+        return result.set_index(x)
+    return df.groupby(x, observed=True)[list(y_columns)].agg(agg)
+
+
+# Vérifie que deux moteurs produisent le même résultat
+def frames_match(left, right):
+    try:
+        pd.testing.assert_frame_equal(
+            left, right, check_dtype=False, check_categorical=False, check_index_type=False
+        )
+        return True
+    except AssertionError:
+        return False
+
+
+def show_engine_comparison(result, reference):
+    if frames_match(result, reference):
+        st.info("🔍 Résultat DuckDB identique au moteur pandas.")
+    else:
+        st.warning("🔍 Le résultat DuckDB diffère du moteur pandas.")
+
+# ----- SECTION VUES VERSIONNÉES -----
+
+# Application d'une transformation paramétrée à une colonne
+def apply_column_transform(values, transform):
+    if transform[0] == "fillna":
+        return values.fillna(transform[1])
+    if transform[0] == "scale":
+        min_val, max_val = transform[1], transform[2]
+        return (values.astype("float64") - min_val) / (max_val - min_val)
+    raise ValueError(f"Transformation inconnue : {transform[0]}")
+
+
+# Vue versionnée d'un DataFrame de base immuable : positions des lignes conservées,
+# transformations de colonnes et journal des opérations. Rien n'est copié tant que
+# la vue n'est pas matérialisée (affichage, export).
+class DatasetView:
+    def __init__(self, base, version, rows=None, transforms=None, log=(), owns_base=False, base_version=None):
+        self.base = base
+        self.version = version
+        self.base_version = version if base_version is None else base_version
+        self.rows = rows
+        self.transforms = transforms or {}
+        self.log = log
+        self.owns_base = owns_base
+
+    def __len__(self):
+        return len(self.base) if self.rows is None else len(self.rows)
+
+    @property
+    def columns(self):
+        return self.base.columns
+
+    @property
+    def empty(self):
+        return len(self) == 0 or len(self.columns) == 0
+
+    @property
+    def dtypes(self):
+        return self.head(0).dtypes
+
+    @property
+    def nbytes(self):
+        rows_bytes = 0 if self.rows is None else self.rows.nbytes
+        return rows_bytes + (estimate_nbytes(self.base) if self.owns_base else 0)
+
+    def numeric_columns(self):
+        return self.base.select_dtypes(include="number").columns
+
+    def _derive(self, operation, rows, transforms):
+        view = DatasetView(
+            self.base,
+            derive_version(self.version, *operation),
+            rows,
+            transforms,
+            self.log + (operation,),
+            self.owns_base,
+        )
+        # Une base sans version le reste : ses vues dérivées ne doivent pas servir de clé de cache
+        view.base_version = self.base_version
+        return view
+
+    # Sélection de lignes : masque booléen exprimé dans l'ordre des lignes de la vue
+    def select(self, mask, *operation):
+        positions = np.flatnonzero(mask)
+        rows = positions if self.rows is None else self.rows[positions]
+        return self._derive(operation, rows, self.transforms)
+
+    def with_transforms(self, transforms, *operation):
+        merged = dict(self.transforms)
+        for col, transform in transforms.items():
+            merged[col] = merged.get(col, ()) + (transform,)
+        return self._derive(operation, self.rows, merged)
+
+    def column(self, name):
+        values = self.base[name]
+        if self.rows is not None:
+            values = values.take(self.rows)
+        for transform in self.transforms.get(name, ()):
+            values = apply_column_transform(values, transform)
+        return values
+
+    def frame(self, columns=None):
+        names = list(self.columns) if columns is None else list(columns)
+        frame = self.base[names]
+        if self.rows is not None:
+            frame = frame.take(self.rows)
+        transformed = [col for col in names if self.transforms.get(col)]
+        if not transformed:
+            return frame
+
+        # Colonnes numériques NumPy : un seul bloc 2-D transformé en place
+        dtypes = frame.dtypes
+        vectorized = [col for col in transformed if is_numpy_numeric(dtypes[col])]
+        if vectorized:
+            multiplier, offset, fill = (
+                np.array(values, dtype="float64")
+                for values in zip(
+                    *(compose_column_transforms(self.transforms[col]) for col in vectorized), strict=True
+                )
+            )
+            block = apply_block_transforms(numeric_block(frame[vectorized]), multiplier, offset, fill)
+            result = pd.DataFrame(block, index=frame.index, columns=vectorized, copy=False)
+            for col in vectorized:
+                # Un simple remplissage conserve le type d'origine (float32...)
+                if all(transform[0] == "fillna" for transform in self.transforms[col]):
+                    result[col] = result[col].astype(dtypes[col])
+            frame = pd.concat([frame.drop(columns=vectorized), result], axis=1)[names]
+
+        for col in transformed:
+            if col not in vectorized:
+                for transform in self.transforms[col]:
+                    frame[col] = apply_column_transform(frame[col], transform)
+        return frame
+
+    # Matérialise uniquement les lignes demandées (positions dans la vue)
+    def take(self, positions, columns=None):
+        rows = positions if self.rows is None else self.rows[positions]
+        return DatasetView(self.base, self.version, rows, self.transforms).frame(columns)
+
+    def head(self, n=5):
+        return self.take(np.arange(min(n, len(self))))
+
+
+# Empreinte 64 bits de chaque ligne sur les colonnes clés
+def row_hashes(frame, columns):
+    frame = frame[list(columns)]
+    float_cols = frame.select_dtypes(include="floating").columns
+    if len(float_cols):
+        # -0.0 et 0.0 sont des doublons pour pandas : même empreinte
+        frame[float_cols] = frame[float_cols] + 0.0
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+# Calculée une fois par version et par jeu de colonnes clés
+@st.cache_resource(max_entries=8)
+def get_row_hashes(_frame, version, columns):
+    return row_hashes(_frame, columns)
+
+
+# Empreintes des lignes d'une vue : celles de la base, suivies au fil des filtres par les positions.
+# Seul le remplissage des valeurs manquantes change l'égalité des lignes (la normalisation est injective).
+# Sans version (base non identifiée), rien n'est mis en cache : la clé serait partagée entre jeux de données.
+def view_row_hashes(view, subset=None):
+    columns = tuple(subset) if subset else tuple(view.columns)
+    if any(transform[0] == "fillna" for col in columns for transform in view.transforms.get(col, ())):
+        if view.base_version is None:
+            return row_hashes(view.frame(list(columns)), columns)
+        return get_row_hashes(view.frame(list(columns)), view.version, columns)
+    if view.base_version is None:
+        hashes = row_hashes(view.base, columns)
+    else:
+        hashes = get_row_hashes(view.base, view.base_version, columns)
+    return hashes if view.rows is None else hashes[view.rows]
+
+
+# Regroupement par empreinte : première occurrence de chaque groupe et taille des groupes
+def hash_groups(hashes):
+    codes, uniques = pd.factorize(hashes)
+    first = np.empty(len(uniques), dtype=np.int64)
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return {"counts": np.bincount(codes, minlength=len(uniques)), "first": first}
+
+
+DUPLICATE_REPORT_GROUPS = 10
+
+
+# Rapport avant suppression : lignes en double, nombre de groupes et plus grands groupes
+@st.cache_data(max_entries=16)
+def duplicate_report(_view, version, subset=None, max_groups=DUPLICATE_REPORT_GROUPS):
+    groups = hash_groups(view_row_hashes(_view, subset))
+    counts = groups["counts"]
+    repeated = np.flatnonzero(counts > 1)
+    largest = repeated[np.argsort(-counts[repeated], kind="stable")[:max_groups]]
+    examples = _view.take(groups["first"][largest], list(subset) if subset else None)
+    examples.insert(0, "Occurrences", counts[largest])
+    return {
+        "rows": len(_view),
+        "duplicates": int((counts[repeated] - 1).sum()),
+        "groups": len(repeated),
+        "largest": examples.reset_index(drop=True),
+    }
+
+
+# Affiche le rapport des doublons sur les données qui entrent dans l'étape de suppression
+def show_duplicate_report(container, view, cleaning_options, engine="pandas"):
+    previous_steps = {step: cleaning_options.get(step) for step in CLEANING_STEPS[:CLEANING_STEPS.index("dropduplicates")]}
+    view = run_cleaning_pipeline(view, previous_steps, engine)
+    subset = tuple(cleaning_options.get("duplicate_subset") or ()) or None
+    report = duplicate_report(view, view.version, subset)
+    if report["duplicates"] == 0:
+        container.caption("Aucun doublon détecté.")
+        return
+    container.caption(
+        f"{report['duplicates']} doublons dans {report['groups']} groupes "
+        f"({report['duplicates'] / report['rows']:.1%} des lignes)."
+    )
+    with container.expander("Plus grands groupes de doublons"):
+        st.dataframe(report["largest"], use_container_width=True)
+
+
+# Profil d'une vue complété à la demande : seules les colonnes demandées et pas encore profilées pour
+# cette version sont lues ; sans sélection de lignes, les colonnes non transformées reprennent le profil de base
+def get_view_profile(view, columns=None):
+    if view.rows is None and not view.transforms and view.version == view.base_version:
+        return get_dataset_profile(view.base, view.version)
+
+    cache = get_profile_cache()
+    profile = cache.get(view.version)
+    cached = profile is not None
+    if not cached:
+        profile = DatasetProfile(len(view), {})
+        if view.rows is None and view.base_version is not None:
+            base_profile = get_dataset_profile(view.base, view.base_version)
+            profile = profile.with_columns(len(view), {
+                col: stats for col, stats in base_profile.columns.items() if col not in view.transforms
+            })
+
+    missing = [col for col in (view.columns if columns is None else columns) if col not in profile.columns]
+    if missing:
+        profile = profile.with_columns(len(view), profile_columns(view.frame(missing), missing))
+    if missing or not cached:
+        cache.put(view.version, profile, estimate_nbytes(profile))
+    return profile
+
+
+# ----- SECTION ESQUISSES DE CARDINALITÉ -----
+
+# Esquisses calculées à l'ingestion (construction du profil), bloc par bloc et fusionnables :
+# HyperLogLog pour le nombre de valeurs distinctes, Space-Saving et Count-Min pour les fréquences
+SKETCH_CHUNK_ROWS = 1_000_000
+HLL_PRECISION = 14
+HEAVY_HITTERS_K = 1000
+COUNT_MIN_WIDTH_BITS = 14
+COUNT_MIN_DEPTH = 4
+
+
+def hash_values(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class HyperLogLog:
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def update(self, hashes):
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Rang du premier bit à 1 dans les bits restants (frexp donne la longueur en bits)
+        bit_length = np.frexp(rest.astype("float64"))[1]
+        np.maximum.at(self.registers, index, (64 - self.precision - bit_length + 1).astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        return HyperLogLog(self.precision, np.maximum(self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        raw = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            return m * np.log(m / zeros)  # Petites cardinalités : comptage linéaire
+        return raw
+
+    @property
+    def relative_error(self):
+        return 1.04 / np.sqrt(len(self.registers))
+
+
+# Space-Saving fusionnable : une valeur absente d'un résumé a pu y apparaître au plus « floor » fois
+class SpaceSaving:
+    def __init__(self, k=HEAVY_HITTERS_K, counts=None, errors=None, floor=0):
+        self.k = k
+        self.counts = pd.Series(dtype="int64") if counts is None else counts
+        self.errors = pd.Series(0, index=self.counts.index, dtype="int64") if errors is None else errors
+        self.floor = floor
+
+    @classmethod
+    def from_values(cls, values, k=HEAVY_HITTERS_K):
+        return cls(k).truncated(values.value_counts(sort=True).astype("int64"), None, 0)
+
+    def truncated(self, counts, errors, floor):
+        if errors is None:
+            errors = pd.Series(0, index=counts.index, dtype="int64")
+        if len(counts) > self.k:
+            counts = counts.sort_values(ascending=False, kind="stable")
+            floor = max(floor, int(counts.iloc[self.k]))
+            counts = counts.iloc[:self.k]
+            errors = errors.reindex(counts.index)
+        return SpaceSaving(self.k, counts, errors, floor)
+
+    def merge(self, other):
+        index = self.counts.index.union(other.counts.index, sort=False)
+        counts = self.counts.reindex(index, fill_value=self.floor) + other.counts.reindex(index, fill_value=other.floor)
+        errors = self.errors.reindex(index, fill_value=self.floor) + other.errors.reindex(index, fill_value=other.floor)
+        return self.truncated(counts.astype("int64"), errors.astype("int64"), self.floor + other.floor)
+
+    def top(self, n=None):
+        counts = self.counts.sort_values(ascending=False, kind="stable")
+        return counts if n is None else counts.iloc[:n]
+
+
+class CountMinSketch:
+    def __init__(self, width_bits=COUNT_MIN_WIDTH_BITS, depth=COUNT_MIN_DEPTH, table=None):
+        self.width_bits = width_bits
+        self.seeds = (np.arange(1, depth + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)) | np.uint64(1)
+        self.table = np.zeros((depth, 1 << width_bits), dtype=np.int64) if table is None else table
+
+    def _buckets(self, hashes):
+        return ((hashes[None, :] * self.seeds[:, None]) >> np.uint64(64 - self.width_bits)).astype(np.int64)
+
+    def update(self, hashes):
+        for row, buckets in enumerate(self._buckets(hashes)):
+            self.table[row] += np.bincount(buckets, minlength=self.table.shape[1])
+        return self
+
+    def merge(self, other):
+        return CountMinSketch(self.width_bits, len(self.table), self.table + other.table)
+
+    def estimate(self, hashes):
+        buckets = self._buckets(np.asarray(hashes, dtype=np.uint64))
+        return self.table[np.arange(len(self.table))[:, None], buckets].min(axis=0)
+
+
+# Esquisses d'une colonne, construites bloc par bloc sur les valeurs non manquantes
+class ColumnSketch:
+    def __init__(self, hll=None, heavy_hitters=None, count_min=None, dtype=None):
+        self.hll = hll or HyperLogLog()
+        self.heavy_hitters = heavy_hitters or SpaceSaving()
+        self.count_min = count_min or CountMinSketch()
+        self.dtype = dtype
+
+    @classmethod
+    def from_series(cls, series, chunk_rows=SKETCH_CHUNK_ROWS, frequencies=True):
+        sketch = cls(dtype=series.dtype)
+        for start in range(0, len(series), chunk_rows):
+            chunk = series.iloc[start:start + chunk_rows].dropna()
+            hashes = hash_values(chunk)
+            sketch.hll.update(hashes)
+            if frequencies:
+                sketch.count_min.update(hashes)
+                sketch.heavy_hitters = sketch.heavy_hitters.merge(SpaceSaving.from_values(chunk))
+        return sketch
+
+    def merge(self, other):
+        return ColumnSketch(
+            self.hll.merge(other.hll),
+            self.heavy_hitters.merge(other.heavy_hitters),
+            self.count_min.merge(other.count_min),
+            self.dtype,
+        )
+
+    def distinct(self):
+        return self.hll.estimate()
+
+    @property
+    def nbytes(self):
+        heavy_hitters = self.heavy_hitters.counts, self.heavy_hitters.errors
+        return (
+            self.hll.registers.nbytes
+            + self.count_min.table.nbytes
+            + sum(int(series.memory_usage(deep=True)) for series in heavy_hitters)
+        )
+
+    # Nombre de lignes estimé (par excès) pour un ensemble de valeurs, hachées avec le type de la colonne
+    # (l'empreinte d'un entier ou d'un flottant dépend de son dtype)
+    def frequency(self, values):
+        if len(values) == 0:
+            return 0
+        lookup = pd.Series(list(values), dtype=object if self.dtype is None else self.dtype)
+        return int(self.count_min.estimate(hash_values(lookup)).sum())
+
+
+# ----- SECTION PROFIL DES COLONNES -----
+
+# Nombre maximal de valeurs distinctes conservées pour les listes de choix
+PROFILE_MAX_UNIQUES = 10_000
+PROFILE_CACHE_ENTRIES = 64
+PROFILE_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+# Statistiques de chaque colonne, calculées une fois par version du jeu de données
+class DatasetProfile:
+    def __init__(self, num_rows, columns):
+        self.num_rows = num_rows
+        self.columns = columns
+
+    @property
+    def missing_total(self):
+        return int(sum(stats["nulls"] for stats in self.columns.values()))
+
+    def numeric_columns(self):
+        return [col for col, stats in self.columns.items() if "mean" in stats and not stats.get("boolean")]
+
+    def uniques(self, column):
+        return self.columns[column]["uniques"]
+
+    def nunique(self, column):
+        return self.columns[column]["nunique"]
+
+    # Colonnes à forte cardinalité : nombre de valeurs distinctes estimé, choix limités aux plus fréquentes
+    def is_approximate(self, column):
+        return self.columns[column].get("approximate", False)
+
+    def sketch(self, column):
+        return self.columns[column].get("sketch")
+
+    def min_max(self, column):
+        return self.columns[column]["min"], self.columns[column]["max"]
+
+    def mean(self, column):
+        return self.columns[column]["mean"]
+
+    # Équivalent de describe() à partir des statistiques stockées
+    def describe(self):
+        numeric_cols = self.numeric_columns()
+        if numeric_cols:
+            return pd.DataFrame(
+                {col: [self.columns[col][stat] for stat in PROFILE_STATS] for col in numeric_cols},
+                index=PROFILE_STATS,
+            )
+        return pd.DataFrame(
+            {col: [stats["count"], stats["nunique"]] for col, stats in self.columns.items()},
+            index=["count", "unique"],
+        )
+
+    def with_columns(self, num_rows, updated_columns):
+        return DatasetProfile(num_rows, {**self.columns, **updated_columns})
+
+    # Taille en cache : esquisses des colonnes approchées et listes de valeurs distinctes
+    @property
+    def nbytes(self):
+        total = 0
+        for stats in self.columns.values():
+            if stats.get("sketch") is not None:
+                total += stats["sketch"].nbytes
+            if stats.get("uniques"):
+                total += int(pd.Series(stats["uniques"], dtype=object).memory_usage(index=False, deep=True))
+        return total
+
+
+def profile_columns(df, columns):
+    stats = {}
+    columns = list(columns)
+    numeric_cols = [col for col in df.select_dtypes(include="number").columns if col in columns]
+
+    # Colonnes numériques : toutes les statistiques en opérations vectorisées sur le bloc
+    if numeric_cols:
+        block = df[numeric_cols]
+        counts = block.count()
+        quantiles = block.quantile([0.25, 0.5, 0.75])
+        means, stds, mins, maxs = block.mean(), block.std(), block.min(), block.max()
+        for col in numeric_cols:
+            # Comptage exact seulement si HyperLogLog annonce une cardinalité modeste
+            distinct = ColumnSketch.from_series(df[col], frequencies=False).distinct()
+            approximate = distinct > PROFILE_MAX_UNIQUES
+            stats[col] = {
+                "nulls": len(df) - int(counts[col]),
+                "nunique": int(round(distinct)) if approximate else int(df[col].nunique()),
+                "approximate": approximate,
+                "count": float(counts[col]),
+                "mean": float(means[col]),
+                "std": float(stds[col]),
+                "min": float(mins[col]),
+                "25%": float(quantiles.at[0.25, col]),
+                "50%": float(quantiles.at[0.5, col]),
+                "75%": float(quantiles.at[0.75, col]),
+                "max": float(maxs[col]),
+            }
+
+    for col in columns:
+        if col in stats:
+            continue
+        sketch = None
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            sketch = ColumnSketch.from_series(df[col])
+        if sketch is not None and sketch.distinct() > PROFILE_MAX_UNIQUES:
+            # Forte cardinalité : aucune liste exacte des valeurs, seulement les plus fréquentes ;
+            # l'esquisse n'est gardée que pour ces colonnes (estimation des fréquences)
+            stats[col] = {
+                "nulls": int(df[col].isna().sum()),
+                "count": float(df[col].count()),
+                "nunique": int(round(sketch.distinct())),
+                "approximate": True,
+                "uniques": list(sketch.heavy_hitters.top().index),
+                "sketch": sketch,
+            }
+        else:
+            uniques = df[col].dropna().unique()
+            stats[col] = {
+                "nulls": int(df[col].isna().sum()),
+                "count": float(df[col].count()),
+                "nunique": len(uniques),
+                "uniques": list(uniques[:PROFILE_MAX_UNIQUES]),
+            }
+
+    # Booléens : hors des colonnes numériques (comme select_dtypes), mais moyenne et bornes disponibles
+    # pour les pages qui les traitent en nombres (is_numeric_dtype, page Prédiction)
+    for col in columns:
+        if pd.api.types.is_bool_dtype(df[col].dtype):
+            values = df[col].astype("float64")
+            stats[col].update({
+                "boolean": True,
+                "mean": float(values.mean()),
+                "std": float(values.std()),
+                "min": float(values.min()),
+                "max": float(values.max()),
+            })
+    return stats
+
+
+def build_profile(df):
+    return DatasetProfile(len(df), profile_columns(df, df.columns))
+
+
+# Mise à jour après nettoyage : les statistiques du parent sont reprises pour les colonnes intactes,
+# seules les colonnes touchées sont relues dans la vue nettoyée
+def profile_after_cleaning(parent, view, cleaning_options):
+    if len(view) != parent.num_rows:
+        # Lignes supprimées : toutes les colonnes changent, get_view_profile les profile à la demande
+        return DatasetProfile(len(view), {})
+
+    numeric_cols = parent.numeric_columns()
+    if cleaning_options.get("normalize") and not cleaning_options.get("fillna"):
+        # Normalisation min-max : transformation affine des statistiques existantes
+        updated = {}
+        for col in numeric_cols:
+            stats = parent.columns[col]
+            scale = stats["max"] - stats["min"]
+            if scale > 0:
+                updated[col] = {
+                    **stats,
+                    **{key: (stats[key] - stats["min"]) / scale for key in ["mean", "min", "25%", "50%", "75%", "max"]},
+                    "std": stats["std"] / scale,
+                }
+        return parent.with_columns(len(view), updated)
+
+    affected = []
+    if cleaning_options.get("fillna"):
+        affected = [col for col in numeric_cols if parent.columns[col]["nulls"] > 0]
+    if cleaning_options.get("normalize"):
+        affected = numeric_cols
+    return parent.with_columns(len(view), profile_columns(view.frame(affected), affected))
+
+
+@st.cache_resource
+def get_profile_cache():
+    return DatasetCache(DATASET_CACHE_MAX_BYTES, max_entries=PROFILE_CACHE_ENTRIES)
+
+
+# Liste de choix d'une colonne catégorielle ; pour les fortes cardinalités, seules les valeurs
+# les plus fréquentes sont proposées et le nombre de lignes sélectionnées est estimé par Count-Min
+def category_picker(container, label, profile, column, key=None):
+    selected = container.multiselect(label, profile.uniques(column), key=key)
+    if profile.is_approximate(column):
+        error = profile.sketch(column).hll.relative_error
+        container.caption(
+            f"≈{profile.nunique(column)} valeurs distinctes (±{error:.1%}) : "
+            f"les {len(profile.uniques(column))} plus fréquentes sont proposées."
+        )
+        if selected:
+            container.caption(f"≈{profile.sketch(column).frequency(selected)} lignes correspondantes (au plus)")
+    return selected
+
+
+def get_dataset_profile(df, version, loader=None):
+    return get_profile_cache().get_or_load(version, loader or (lambda: build_profile(df)))
+
+
+# ----- SECTION STATISTIQUES APPROCHÉES -----
+
+# Résumé en une passe par blocs : moments de Welford et quantiles par t-digest, fusionnables
+APPROX_CHUNK_ROWS = 1_000_000
+APPROX_STATS_ROWS = 1_000_000  # Au-delà, le mode approché est sélectionné par défaut
+TDIGEST_COMPRESSION = 200
+STATS_MODES = ["Approché", "Exact"]
+
+
+# Nombre, moyenne, variance, minimum et maximum ; fusion par la formule de Chan
+class MomentSketch:
+    def __init__(self, count=0, mean=0.0, m2=0.0, min_value=np.inf, max_value=-np.inf):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def from_values(cls, values):
+        if len(values) == 0:
+            return cls()
+        mean = values.mean()
+        return cls(len(values), mean, float(((values - mean) ** 2).sum()), values.min(), values.max())
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return MomentSketch(
+            count,
+            self.mean + delta * other.count / count,
+            self.m2 + other.m2 + delta ** 2 * self.count * other.count / count,
+            min(self.min, other.min),
+            max(self.max, other.max),
+        )
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+# t-digest « merging » : les centroïdes triés sont regroupés par unité de la fonction d'échelle k1,
+# ce qui garde les queues de distribution précises avec quelques centaines de centroïdes
+class TDigest:
+    def __init__(self, compression=TDIGEST_COMPRESSION, means=None, weights=None):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else means
+        self.weights = np.empty(0) if weights is None else weights
+
+    # Poids unitaires : les limites des centroïdes se déduisent directement des rangs
+    @classmethod
+    def from_values(cls, values, compression=TDIGEST_COMPRESSION):
+        n = len(values)
+        if n == 0:
+            return cls(compression)
+        units = np.arange(np.floor(-compression / 4) + 1, np.floor(compression / 4) + 1)
+        ranks = np.ceil((np.sin(2 * np.pi * units / compression) + 1) / 2 * n - 0.5).astype(np.int64)
+        starts = np.unique(np.r_[0, ranks[(ranks > 0) & (ranks < n)]])
+        weights = np.diff(np.r_[starts, n]).astype("float64")
+        return cls(compression, np.add.reduceat(np.sort(values), starts) / weights, weights)
+
+    def merge(self, other):
+        return TDigest(
+            self.compression,
+            np.concatenate([self.means, other.means]),
+            np.concatenate([self.weights, other.weights]),
+        ).compressed()
+
+    def compressed(self):
+        if len(self.means) <= 1:
+            return self
+        order = np.argsort(self.means, kind="stable")
+        means, weights = self.means[order], self.weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, np.diff(k) != 0])
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return TDigest(self.compression, merged_means, merged_weights)
+
+    # Quantile estimé et demi-largeur de l'intervalle entre centroïdes voisins
+    def quantile(self, q, min_value, max_value):
+        if len(self.means) == 0:
+            return np.nan, np.nan
+        cumulative = np.cumsum(self.weights)
+        positions = np.r_[0.0, (cumulative - self.weights / 2) / cumulative[-1], 1.0]
+        values = np.r_[min_value, self.means, max_value]
+        i = min(max(int(np.searchsorted(positions, q, side="right")), 1), len(positions) - 1)
+        return float(np.interp(q, positions, values)), float((values[i] - values[i - 1]) / 2)
+
+
+def sketch_column(values, chunk_rows=APPROX_CHUNK_ROWS):
+    moments, digest = MomentSketch(), TDigest()
+    for start in range(0, len(values), chunk_rows):
+        chunk = values[start:start + chunk_rows]
+        chunk = chunk[~np.isnan(chunk)]
+        moments = moments.merge(MomentSketch.from_values(chunk))
+        digest = digest.merge(TDigest.from_values(chunk))
+    return moments, digest
+
+
+# Équivalent approché de describe(), avec la demi-largeur d'incertitude de chaque quartile
+@st.cache_data(max_entries=16)
+def approximate_describe(_view, version, chunk_rows=APPROX_CHUNK_ROWS):
+    numeric_cols = list(_view.numeric_columns())
+
+    def describe_column(col):
+        moments, digest = sketch_column(_view.column(col).to_numpy(dtype="float64", na_value=np.nan), chunk_rows)
+        quartiles = [digest.quantile(q, moments.min, moments.max) for q in (0.25, 0.5, 0.75)]
+        min_value, max_value = (moments.min, moments.max) if moments.count else (np.nan, np.nan)
+        return [
+            float(moments.count), float(moments.mean) if moments.count else np.nan, moments.std, min_value,
+            *[estimate for estimate, _ in quartiles], max_value, *[bound for _, bound in quartiles],
+        ]
+
+    # Colonnes indépendantes : esquisses calculées en parallèle
+    with ThreadPoolExecutor(max_workers=CLEANING_WORKERS) as pool:
+        rows = list(pool.map(describe_column, numeric_cols))
+    return pd.DataFrame(
+        dict(zip(numeric_cols, rows, strict=True)),
+        index=PROFILE_STATS + ["± 25%", "± 50%", "± 75%"],
+    )
+
+
+# Résumé statistique : approché par défaut sur les gros volumes, exact à la demande
+def show_statistics_summary(view, key):
+    default_mode = 0 if len(view) > APPROX_STATS_ROWS else 1
+    mode = st.radio("Mode de calcul", STATS_MODES, index=default_mode, horizontal=True, key=key)
+    if mode == "Approché" and len(view.numeric_columns()) > 0:
+        st.write(approximate_describe(view, view.version))
+        st.caption(
+            "Quartiles estimés par t-digest : les lignes « ± » donnent la demi-largeur "
+            "de l'intervalle d'incertitude de chaque quartile."
+        )
+    else:
+        numeric_cols = list(view.numeric_columns())
+        st.write(get_view_profile(view, numeric_cols or None).describe())
+
+
+# ----- SECTION PRÉPARATION DES GRAPHIQUES -----
+
+# Agrégations proposées pour le graphique à barres
+BAR_AGGREGATIONS = {"Somme": "sum", "Moyenne": "mean", "Nombre": "count"}
+
+
+# Une barre par catégorie : la taille du graphique dépend du nombre de catégories, pas de lignes
+@st.cache_data(max_entries=64)
+def aggregate_bar_data(_df, version, bar_x, y_columns, agg, engine):
+    return engine_group_aggregate(_df, bar_x, list(y_columns), agg, engine).reset_index()
+
+
+# Au-delà de ce nombre de lignes, les graphiques passent en mode « gros volumes » (WebGL)
+LARGE_DATA_ROWS = 20_000
+LINE_POINT_BUDGET = 2_000  # Environ deux points par pixel de largeur
+SCATTER_POINT_BUDGET = 5_000
+DENSITY_GRID = 64
+
+
+# Largest-Triangle-Three-Buckets : indices des points conservant la forme de la courbe
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+
+        # Sommet moyen du seau suivant, puis point du seau courant formant le plus grand triangle
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+# Abscisses numériques pour LTTB : valeurs (nombres, dates) si croissantes, sinon positions
+def lttb_x_values(series):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        values = series.to_numpy().astype("datetime64[ns]").astype(np.int64).astype("float64")
+    elif pd.api.types.is_numeric_dtype(series.dtype):
+        values = series.to_numpy(dtype="float64", na_value=np.nan)
+    else:
+        return np.arange(len(series), dtype="float64")
+    if np.isnan(values).any() or np.any(np.diff(values) < 0):
+        return np.arange(len(series), dtype="float64")
+    return values
+
+
+# Séries de la courbe réduites par LTTB, au format long (une ligne par point affiché)
+@st.cache_data(max_entries=32)
+def prepare_line_data(_df, version, x_col, y_columns, budget):
+    x_values = lttb_x_values(_df[x_col])
+    parts = []
+    for y_col in y_columns:
+        y_values = _df[y_col].to_numpy(dtype="float64", na_value=np.nan)
+        valid = np.flatnonzero(~np.isnan(y_values))
+        keep = valid[lttb_indices(x_values[valid], y_values[valid], budget)]
+        parts.append(pd.DataFrame({
+            x_col: _df[x_col].iloc[keep].to_numpy(),
+            "variable": y_col,
+            "value": y_values[keep],
+        }))
+    return pd.concat(parts, ignore_index=True)
+
+
+# Échantillon par densité : au plus k points par case d'une grille, pour garder les zones peu denses
+def density_sample_positions(x, y, budget, grid=DENSITY_GRID, seed=0):
+    valid = np.flatnonzero(~(np.isnan(x) | np.isnan(y)))
+    if len(valid) <= budget:
+        return valid
+
+    def to_bins(values):
+        low, high = values.min(), values.max()
+        scale = grid / (high - low) if high > low else 0
+        return np.minimum(((values - low) * scale).astype(np.int64), grid - 1)
+
+    cells = to_bins(x[valid]) * grid + to_bins(y[valid])
+    counts = np.bincount(cells, minlength=grid * grid)
+
+    # Plus grande capacité par case respectant le budget (recherche dichotomique)
+    low, high = 1, int(counts.max())
+    while low < high:
+        cap = (low + high + 1) // 2
+        if np.minimum(counts, cap).sum() <= budget:
+            low = cap
+        else:
+            high = cap - 1
+
+    order = np.random.default_rng(seed).permutation(len(valid))
+    rank = pd.Series(cells[order]).groupby(cells[order]).cumcount().to_numpy()
+    return np.sort(valid[order[rank < low]])
+
+
+@st.cache_data(max_entries=32)
+def sample_scatter_data(_df, version, columns, x_col, y_col, budget):
+    x = _df[x_col].to_numpy(dtype="float64", na_value=np.nan)
+    y = _df[y_col].to_numpy(dtype="float64", na_value=np.nan)
+    return _df[list(columns)].iloc[density_sample_positions(x, y, budget)]
+
+
+def show_reduction_caption(original_points, shown_points):
+    st.caption(f"⚡ Mode gros volumes : {original_points:,} → {shown_points:,} points affichés (WebGL)")
+
+
+# Histogrammes calculés côté serveur, par blocs pour les grandes colonnes
+HISTOGRAM_BINS = 30
+HISTOGRAM_CHUNK_ROWS = 5_000_000
+
+
+def compute_histogram(values, nbins=HISTOGRAM_BINS, chunk_rows=HISTOGRAM_CHUNK_ROWS):
+    values = np.asarray(values, dtype="float64")
+    low, high = np.inf, -np.inf
+    for start in range(0, len(values), chunk_rows):
+        chunk = values[start:start + chunk_rows]
+        chunk = chunk[np.isfinite(chunk)]
+        if len(chunk):
+            low, high = min(low, chunk.min()), max(high, chunk.max())
+    if low > high:
+        low, high = 0.0, 1.0
+
+    edges = np.histogram_bin_edges([], bins=nbins, range=(low, high))
+    counts = np.zeros(nbins, dtype=np.int64)
+    for start in range(0, len(values), chunk_rows):
+        chunk = values[start:start + chunk_rows]
+        counts += np.histogram(chunk[np.isfinite(chunk)], bins=edges)[0]
+    return counts, edges
+
+
+@st.cache_data(max_entries=64)
+def cached_histogram(_df, version, column, nbins=HISTOGRAM_BINS):
+    return compute_histogram(_df[column].to_numpy(dtype="float64", na_value=np.nan), nbins)
+
+
+# Barres jointives : la taille du graphique dépend du nombre de classes, pas de lignes
+def histogram_bar_trace(counts, edges, **kwargs):
+    return go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges), **kwargs)
+
+
+# Boîtes à moustaches précalculées : quartiles, moustaches et échantillon d'extrêmes par groupe
+BOX_OUTLIER_CAP = 500
+
+
+@st.cache_data(max_entries=32)
+def box_statistics(_df, version, value_col, group_col=None, outlier_cap=BOX_OUTLIER_CAP):
+    values = _df[value_col].to_numpy(dtype="float64", na_value=np.nan)
+    if group_col is None:
+        codes, labels = np.zeros(len(values), dtype=np.int64), pd.Index([value_col])
+    else:
+        codes, labels = pd.factorize(_df[group_col], sort=False)
+    keep = (codes >= 0) & ~np.isnan(values)
+    values, codes = values[keep], codes[keep]
+    if len(values) == 0:
+        columns = ["group", "count", "q1", "median", "q3", "lowerfence", "upperfence"]
+        return pd.DataFrame(columns=columns), pd.DataFrame(columns=["group", "value"])
+
+    # Un seul tri (groupe, valeur) : chaque groupe devient une tranche contiguë triée
+    order = np.lexsort((values, codes))
+    values, codes = values[order], codes[order]
+    sizes = np.bincount(codes, minlength=len(labels))
+    present = np.flatnonzero(sizes)
+    sizes = sizes[present]
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+    def quantile(q):
+        position = starts + q * (sizes - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, starts + sizes - 1)
+        return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    row_group = np.repeat(np.arange(len(present)), sizes)
+    low_limit, high_limit = (q1 - 1.5 * iqr)[row_group], (q3 + 1.5 * iqr)[row_group]
+    inside = (values >= low_limit) & (values <= high_limit)
+    lowerfence = np.minimum.reduceat(np.where(inside, values, np.inf), starts)
+    upperfence = np.maximum.reduceat(np.where(inside, values, -np.inf), starts)
+
+    stats = pd.DataFrame({
+        "group": labels[present], "count": sizes, "q1": q1, "median": median, "q3": q3,
+        "lowerfence": lowerfence, "upperfence": upperfence,
+    })
+
+    # Extrêmes plafonnés par groupe, répartis régulièrement (les plus extrêmes sont conservés)
+    outlier_pos = np.flatnonzero(~inside)
+    outlier_group = row_group[outlier_pos]
+    outlier_counts = np.bincount(outlier_group, minlength=len(present))
+    first = np.concatenate(([0], np.cumsum(outlier_counts)[:-1]))
+    rank = np.arange(len(outlier_pos)) - first[outlier_group]
+    step = np.maximum(1, -(-outlier_counts // outlier_cap))[outlier_group]
+    last = (outlier_counts - 1)[outlier_group]
+    sampled = outlier_pos[(rank % step == 0) | (rank == last)]
+    outliers = pd.DataFrame({"group": labels[present][row_group[sampled]], "value": values[sampled]})
+    return stats, outliers
+
+
+def box_figure(stats, outliers):
+    fig = go.Figure()
+    for row in stats.itertuples(index=False):
+        label = str(row.group)
+        fig.add_trace(go.Box(
+            name=label, x=[label], q1=[row.q1], median=[row.median], q3=[row.q3],
+            lowerfence=[row.lowerfence], upperfence=[row.upperfence],
+            boxpoints=False,
+        ))
+        group_outliers = outliers.loc[outliers["group"] == row.group, "value"]
+        if len(group_outliers):
+            fig.add_trace(go.Scatter(
+                x=[label] * len(group_outliers), y=group_outliers, mode="markers",
+                marker=dict(size=4), name=label, hoverinfo="y",
+            ))
+    return fig
+
+
+# Camemberts construits à partir des comptages : les N premières catégories + "Autres"
+PIE_TOP_N = 10
+PIE_OTHER_LABEL = "Autres"
+
+
+@st.cache_data(max_entries=64)
+def cached_value_counts(_df, version, column, engine="pandas"):
+    counts = engine_value_counts(_df, column, engine)
+    return counts[counts > 0]
+
+
+def top_n_counts(counts, top_n=PIE_TOP_N):
+    if len(counts) <= top_n:
+        return counts
+    labels = list(counts.index[:top_n]) + [PIE_OTHER_LABEL]
+    values = list(counts.iloc[:top_n]) + [counts.iloc[top_n:].sum()]
+    return pd.Series(values, index=pd.Index(labels, name=counts.index.name), name="count")
+
+
+# Même découpage à partir des valeurs fréquentes de l'esquisse (colonnes à forte cardinalité)
+def top_n_sketch_counts(profile, column, top_n=PIE_TOP_N):
+    top = profile.sketch(column).heavy_hitters.top(top_n)
+    remainder = max(0, int(profile.columns[column]["count"] - top.sum()))
+    labels = list(top.index) + [PIE_OTHER_LABEL]
+    return pd.Series(list(top) + [remainder], index=pd.Index(labels, name=column), name="count")
+
+
+# Cache des figures par session : les traces dépendent des données et des colonnes,
+# les couleurs et annotations sont réappliquées à chaque rerun sur la figure en cache
+FIGURE_CACHE_ENTRIES = 32
+
+
+def get_figure_cache():
+    if "figure_cache" not in st.session_state:
+        st.session_state["figure_cache"] = DatasetCache(DATASET_CACHE_MAX_BYTES, max_entries=FIGURE_CACHE_ENTRIES)
+    return st.session_state["figure_cache"]
+
+
+def cached_figure(key, builder):
+    return get_figure_cache().get_or_load(key, builder)
+
+
+# Une couleur par série, ou par groupe pour les boîtes (les extrêmes suivent leur boîte)
+def color_traces(fig, colors, by_group=False):
+    group = -1
+    for trace in fig.data:
+        if not by_group or trace.type == "box":
+            group += 1
+        color = colors[group % len(colors)]
+        trace.marker.color = color
+        if trace.type in ("scatter", "scattergl") and not by_group:
+            trace.line.color = color
+    return fig
+
+
+def color_pie_slices(fig, colors):
+    fig.update_traces(marker=dict(colors=[colors[i % len(colors)] for i in range(len(fig.data[0].labels))]))
+    return fig
+
+
+def shown_points(fig):
+    return sum(len(trace.x) for trace in fig.data if trace.x is not None)
+
+
+# ----- SECTION JOINTURES -----
+
+# Types de fusion proposés sur la page Fusion (None : juxtaposition par position)
+JOIN_TYPES = {"Interne": "inner", "Gauche": "left", "Externe": "outer", "Par position": None}
+JOIN_SAMPLE_ROWS = 10_000
+
+
+# Codes entiers communs aux clés des deux côtés (-1 : clé manquante, jamais appariée comme en SQL)
+def join_key_codes(left, left_keys, right, right_keys):
+    key_codes = np.zeros(len(left) + len(right), dtype=np.int64)
+    for left_key, right_key in zip(left_keys, right_keys, strict=True):
+        codes, uniques = pd.factorize(pd.concat([left[left_key], right[right_key]], ignore_index=True))
+        # Clé composite : codes combinés puis refactorisés pour rester compacts
+        valid = (key_codes >= 0) & (codes >= 0)
+        combined = np.full(len(codes), -1, dtype=np.int64)
+        combined[valid] = pd.factorize(key_codes[valid] * len(uniques) + codes[valid])[0]
+        key_codes = combined
+    return key_codes[:len(left)], key_codes[len(left):]
+
+
+# Codes positionnels : les versions doivent identifier exactement les lignes, leur ordre et l'origine des clés
+@st.cache_resource(max_entries=16)
+def factorize_join_keys(_left, left_version, left_keys, _right, right_version, right_keys):
+    return join_key_codes(_left, left_keys, _right, right_keys)
+
+
+# Taille exacte du résultat (à partir des effectifs par clé) et mémoire estimée sur un échantillon
+def estimate_join(left, right, left_codes, right_codes, how):
+    size = int(max(left_codes.max(initial=-1), right_codes.max(initial=-1))) + 1
+    left_counts = np.bincount(left_codes[left_codes >= 0], minlength=size)
+    right_counts = np.bincount(right_codes[right_codes >= 0], minlength=size)
+    rows = int((left_counts * right_counts).sum())
+    if how in ("left", "outer"):
+        rows += int((left_codes < 0).sum() + left_counts[right_counts == 0].sum())
+    if how == "outer":
+        rows += int((right_codes < 0).sum() + right_counts[left_counts == 0].sum())
+    row_bytes = sum(
+        frame.head(JOIN_SAMPLE_ROWS).memory_usage(index=False, deep=True).sum() / max(1, min(len(frame), JOIN_SAMPLE_ROWS))
+        for frame in (left, right)
+    )
+    return {"rows": rows, "bytes": int(rows * row_bytes)}
+
+
+# Jointure par hachage : la table (codes triés + début de chaque clé) est construite sur le plus petit côté
+def hash_join_positions(left_codes, right_codes, how):
+    build_right = len(right_codes) <= len(left_codes)
+    build, probe = (right_codes, left_codes) if build_right else (left_codes, right_codes)
+
+    size = int(max(build.max(initial=-1), probe.max(initial=-1))) + 1
+    order = np.argsort(build, kind="stable")
+    counts = np.bincount(build[build >= 0], minlength=size)
+    starts = np.r_[0, np.cumsum(counts)[:-1]] + int((build < 0).sum())
+
+    probe_counts = np.where(probe >= 0, counts[np.maximum(probe, 0)], 0)
+    probe_rows = np.repeat(np.arange(len(probe)), probe_counts)
+    offsets = np.arange(len(probe_rows)) - np.repeat(np.cumsum(probe_counts) - probe_counts, probe_counts)
+    build_rows = order[np.repeat(starts[np.maximum(probe, 0)], probe_counts) + offsets]
+
+    left_rows, right_rows = (probe_rows, build_rows) if build_right else (build_rows, probe_rows)
+    if not build_right:
+        # Résultat dans l'ordre des lignes de gauche, comme pandas.merge
+        order = np.argsort(left_rows, kind="stable")
+        left_rows, right_rows = left_rows[order], right_rows[order]
+
+    if how in ("left", "outer"):
+        unmatched = np.flatnonzero(np.bincount(left_rows, minlength=len(left_codes)) == 0)
+        position = np.searchsorted(left_rows, unmatched)
+        left_rows = np.insert(left_rows, position, unmatched)
+        right_rows = np.insert(right_rows, position, -1)
+    if how == "outer":
+        unmatched = np.flatnonzero(np.bincount(right_rows[right_rows >= 0], minlength=len(right_codes)) == 0)
+        left_rows = np.r_[left_rows, np.full(len(unmatched), -1)]
+        right_rows = np.r_[right_rows, unmatched]
+    return left_rows, right_rows
+
+
+def take_with_missing(frame, rows):
+    return {
+        col: pd.api.extensions.take(frame[col].array, rows, allow_fill=True)
+        for col in frame.columns
+    }
 
-# Nouvelle fonction pour afficher les options de filtrage améliorées
-def display_enhanced_filter_options():
-    st.sidebar.markdown("""
-    <div class="option-filtrage">
-        <div class="filtrage-titre">
-            Options de filtrage
-        </div>
-    </div>
-    
-    <script>
-    // JavaScript pour ajouter l'interactivité
-    document.addEventListener('DOMContentLoaded', function() {
-        document.querySelectorAll('.bouton-filtre').forEach(function(btn) {
-            btn.addEventListener('click', function() {
-                // Animation simple
-                this.style.backgroundColor = '#1E3A8A';
-                setTimeout(() => {
-                    this.style.backgroundColor = '';
-                }, 300);
-            });
-        });
-    });
-    </script>
-    """, unsafe_allow_html=True)
-    
-    # Boutons cachés pour le clicage
-    cat_filter_clicked = st.sidebar.button("Catégories", key="cat_filter", on_click=None)
-    num_filter_clicked = st.sidebar.button("Numériques", key="num_filter", on_click=None)
-    
-    # Logic for filter buttons
-    if cat_filter_clicked:
-        st.session_state["show_filter_category"] = not st.session_state["show_filter_category"]
-        st.session_state["show_filter_numeric"] = False
-        st.rerun()
 
-    if num_filter_clicked:
-        st.session_state["show_filter_numeric"] = not st.session_state["show_filter_numeric"]
-        st.session_state["show_filter_category"] = False
-        st.rerun()
+# Colonnes de droite renommées « colonne (table) » quand le nom existe déjà à gauche
+def joined_column_name(col, left_columns, suffix):
+    return f"{col} ({suffix})" if col in left_columns else col
+
+
+def join_rows(left, right, left_rows, right_rows, suffix):
+    columns = take_with_missing(left, left_rows)
+    for col, values in take_with_missing(right, right_rows).items():
+        columns[joined_column_name(col, left.columns, suffix)] = values
+    return pd.DataFrame(columns)
+
+
+def hash_join(left, right, left_codes, right_codes, how, suffix):
+    left_rows, right_rows = hash_join_positions(left_codes, right_codes, how)
+    return join_rows(left, right, left_rows, right_rows, suffix)
+
+
+# ----- SECTION FUSION HORS MÉMOIRE -----
+
+# Les entrées sont lues par morceaux et réparties sur disque ; seule une paire de partitions est en mémoire
+SPILL_DIR = os.path.join(WORKING_COPY_DIR, "spill")
+SPILL_CHUNK_ROWS = 100_000
+SPILL_DEFAULT_BUDGET_MB = 512
+SPILL_MAX_PARTITIONS = 256
+# Une paire de partitions occupe environ trois fois sa taille brute (entrées, codes, positions, morceau écrit)
+SPILL_MEMORY_FACTOR = 3
+
+
+# Lecture en flux d'une requête Access, sans passer par le cache des résultats.
+# Connexion dédiée : un générateur en pause ne doit pas garder le verrou d'une connexion du pool
+# (les deux entrées d'une fusion viennent en général de la même base).
+def iter_access_chunks(db_path, sql, params, chunk_rows=SPILL_CHUNK_ROWS):
+    conn = pyodbc.connect(access_conn_str(db_path))
+    try:
+        yield from pd.read_sql(sql, conn, params=list(params) or None, chunksize=chunk_rows)
+    finally:
+        conn.close()
+
+
+@st.cache_data(ttl=3600)
+def count_access_rows(db_path, sql, params, mtime):
+    with get_access_pool().connection(db_path) as conn:
+        return conn.cursor().execute(f"SELECT COUNT(*) FROM ({sql})", *params).fetchone()[0]
+
+
+# Source en flux : (nombre de lignes, fonction qui relance la lecture par morceaux)
+def access_source(db_path, table, columns, category_filters, numeric_filters):
+    sql, params = build_access_query(table, columns, category_filters, numeric_filters)
+    rows = count_access_rows(db_path, sql, params, os.path.getmtime(db_path))
+    return rows, lambda: iter_access_chunks(db_path, sql, params)
+
+
+def dataset_source(dataset):
+    return dataset.num_rows, lambda: (batch.to_pandas() for batch in dataset.table.to_batches(SPILL_CHUNK_ROWS))
+
+
+# Premier morceau (pour estimer la taille d'une ligne) sans perdre le flux
+def peek_chunks(chunks):
+    first = next(chunks, None)
+
+    def rest():
+        if first is not None:
+            yield first
+            yield from chunks
+
+    return first, rest()
+
+
+def spill_partition_count(sides, budget_bytes):
+    total = 0
+    for rows, first_chunk in sides:
+        if first_chunk is not None and len(first_chunk):
+            total += rows * first_chunk.memory_usage(index=False, deep=True).sum() / len(first_chunk)
+    return int(np.clip(np.ceil(total * SPILL_MEMORY_FACTOR / budget_bytes), 1, SPILL_MAX_PARTITIONS))
+
+
+# Partition d'après les clés, avec le même hachage des deux côtés (nombres en float64, le reste en texte)
+def partition_ids(chunk, keys, partitions):
+    if partitions == 1 or not keys:
+        return np.zeros(len(chunk), dtype=np.int64)
+    key_columns = {}
+    for i, key in enumerate(keys):
+        values = chunk[key]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            key_columns[i] = values.astype("float64") + 0.0
+        else:
+            key_columns[i] = values.astype(str).where(values.notna())
+    key_frame = pd.DataFrame(key_columns)
+    ids = (pd.util.hash_pandas_object(key_frame, index=False).to_numpy() % partitions).astype(np.int64)
+    # Clés manquantes : jamais appariées, réparties en tourniquet pour ne pas charger une seule partition
+    missing = key_frame.isna().any(axis=1).to_numpy()
+    ids[missing] = np.arange(missing.sum()) % partitions
+    return ids
+
+
+# Écrit une source en partitions (fichiers Arrow en flux). Un nouveau segment est ouvert quand le
+# schéma d'un morceau change (colonne entièrement vide dans un morceau, entiers puis décimaux...)
+def spill_partitions(chunks, keys, partitions, directory, side):
+    segments = [[] for _ in range(partitions)]
+    writers = {}
+    schemas = []
+    try:
+        for chunk in chunks:
+            ids = partition_ids(chunk, keys, partitions)
+            order = np.argsort(ids, kind="stable")
+            bounds = np.searchsorted(ids[order], np.arange(partitions + 1))
+            for part in range(partitions):
+                if bounds[part] == bounds[part + 1]:
+                    continue
+                rows = chunk.iloc[order[bounds[part]:bounds[part + 1]]]
+                table = pa.Table.from_pandas(rows, preserve_index=False).replace_schema_metadata(None)
+                writer, schema = writers.get(part, (None, None))
+                if schema is None or not schema.equals(table.schema):
+                    if writer is not None:
+                        writer.close()
+                    path = os.path.join(directory, f"{side}_{part}_{len(segments[part])}.arrows")
+                    writer, schema = pa.ipc.new_stream(path, table.schema), table.schema
+                    writers[part] = (writer, schema)
+                    segments[part].append(path)
+                    schemas.append(schema)
+                writer.write_table(table)
+    finally:
+        for writer, _ in writers.values():
+            writer.close()
+    schema = pa.unify_schemas(schemas, promote_options="permissive") if schemas else None
+    return segments, schema
+
+
+def read_segments(paths, schema):
+    for path in paths:
+        for batch in pa.ipc.open_stream(pa.memory_map(path, "r")):
+            yield pa.Table.from_batches([batch]).cast(schema)
+
+
+# Une partition entière en mémoire, avec des colonnes Arrow pour garder les types malgré les valeurs manquantes
+def read_partition(paths, schema):
+    table = pa.concat_tables(list(read_segments(paths, schema))) if paths else schema.empty_table()
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+# Écriture atomique du fichier colonnaire final, table par table
+def write_columnar_file(path, schema, tables):
+    os.makedirs(WORKING_COPY_DIR, exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for table in tables:
+                writer.write_table(table.cast(schema))
+    os.replace(tmp_path, path)
+    get_working_copy_store().evict(keep=path)
+    return ColumnarDataset(path)
+
+
+def spilled_schema(schema, columns):
+    return schema if schema is not None else pa.schema([(col, pa.null()) for col in columns])
+
+
+def partition_join_tables(left_segments, left_schema, left_keys, right_segments, right_schema, right_keys, how, suffix):
+    for left_paths, right_paths in zip(left_segments, right_segments, strict=True):
+        left = read_partition(left_paths, left_schema)
+        right = read_partition(right_paths, right_schema)
+        left_codes, right_codes = join_key_codes(left, left_keys, right, right_keys)
+        left_rows, right_rows = hash_join_positions(left_codes, right_codes, how)
+        # Le résultat d'une partition est écrit par morceaux : il peut dépasser la taille de ses entrées
+        for start in range(0, len(left_rows), SPILL_CHUNK_ROWS):
+            stop = start + SPILL_CHUNK_ROWS
+            rows = join_rows(left, right, left_rows[start:stop], right_rows[start:stop], suffix)
+            yield pa.Table.from_pandas(rows, preserve_index=False)
+
+
+# Jointure partitionnée (grace hash join) : les deux entrées sont réparties sur disque par hachage
+# des clés, chaque paire de partitions est jointe en mémoire puis ajoutée au fichier Arrow final.
+# Retourne le jeu colonnaire et le nombre de partitions (None si le résultat existait déjà).
+def spill_join(left_source, left_columns, left_keys, right_source, right_columns, right_keys, how, suffix,
+               dataset_key, budget_bytes):
+    path = working_copy_path(dataset_key)
+    if os.path.exists(path):
+        return ColumnarDataset(path), None
+
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    directory = tempfile.mkdtemp(dir=SPILL_DIR)
+    try:
+        left_count, left_chunks = left_source
+        right_count, right_chunks = right_source
+        left_first, left_chunks = peek_chunks(left_chunks())
+        right_first, right_chunks = peek_chunks(right_chunks())
+        partitions = spill_partition_count([(left_count, left_first), (right_count, right_first)], budget_bytes)
+
+        left_segments, left_schema = spill_partitions(left_chunks, left_keys, partitions, directory, "left")
+        right_segments, right_schema = spill_partitions(right_chunks, right_keys, partitions, directory, "right")
+        left_schema = spilled_schema(left_schema, left_columns)
+        right_schema = spilled_schema(right_schema, right_columns)
+        schema = pa.schema(
+            list(left_schema)
+            + [field.with_name(joined_column_name(field.name, left_schema.names, suffix)) for field in right_schema]
+        )
+        tables = partition_join_tables(
+            left_segments, left_schema, left_keys, right_segments, right_schema, right_keys, how, suffix
+        )
+        return write_columnar_file(path, schema, tables), partitions
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# Copie en flux d'une source unique vers un fichier colonnaire (fusion d'une seule table)
+def spill_copy(source, columns, dataset_key):
+    path = working_copy_path(dataset_key)
+    if os.path.exists(path):
+        return ColumnarDataset(path)
+
+    os.makedirs(SPILL_DIR, exist_ok=True)
+    directory = tempfile.mkdtemp(dir=SPILL_DIR)
+    try:
+        segments, schema = spill_partitions(source[1](), (), 1, directory, "copy")
+        schema = spilled_schema(schema, columns)
+        return write_columnar_file(path, schema, read_segments(segments[0], schema))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# ----- SECTION TABLEAU PAGINÉ -----
+
+# Seule la page visible est matérialisée et envoyée au navigateur
+GRID_PAGE_SIZES = [25, 50, 100, 500]
+GRID_NO_SORT = "(ordre d'origine)"
+
+
+# Permutation de tri d'une colonne, calculée une fois par version, colonne et sens
+@st.cache_resource(max_entries=16)
+def get_sort_permutation(_view, version, column, ascending):
+    values = _view.column(column).reset_index(drop=True)
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+# Lignes dont la colonne contient le texte recherché (sans tenir compte de la casse)
+@st.cache_resource(max_entries=16)
+def get_search_mask(_view, version, column, text):
+    values = _view.column(column)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Recherche sur les catégories puis propagation par les codes
+        matches = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+        codes = values.cat.codes.to_numpy()
+        return (codes >= 0) & np.append(matches, False)[codes]
+    return values.astype(str).str.contains(text, case=False, regex=False, na=False).to_numpy()
+
+
+def grid_positions(view, sort_column=None, ascending=True, search_column=None, search_text=""):
+    positions = None
+    if sort_column is not None:
+        positions = get_sort_permutation(view, view.version, sort_column, ascending)
+    if search_column is not None and search_text:
+        mask = get_search_mask(view, view.version, search_column, search_text)
+        positions = np.flatnonzero(mask) if positions is None else positions[mask[positions]]
+    return positions
+
+
+def show_data_grid(view, key):
+    columns = list(view.columns)
+    sort_col, order_col, search_col, text_col, size_col = st.columns([2, 1, 2, 2, 1])
+    sort_column = sort_col.selectbox("Trier par", [GRID_NO_SORT] + columns, key=f"{key}_sort")
+    ascending = order_col.selectbox("Ordre", ["Croissant", "Décroissant"], key=f"{key}_order") == "Croissant"
+    search_column = search_col.selectbox("Rechercher dans", columns, key=f"{key}_search_column")
+    search_text = text_col.text_input("Contient", key=f"{key}_search")
+    page_size = size_col.selectbox("Lignes", GRID_PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    positions = grid_positions(
+        view,
+        None if sort_column == GRID_NO_SORT else sort_column,
+        ascending,
+        search_column,
+        search_text,
+    )
+    total = len(view) if positions is None else len(positions)
+    page_count = max(1, -(-total // page_size))
+    page = st.number_input(f"Page (sur {page_count})", 1, page_count, 1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    stop = min(start + page_size, total)
+
+    window = np.arange(start, stop) if positions is None else positions[start:stop]
+    st.dataframe(view.take(window), use_container_width=True)
+    st.caption(f"Lignes {start + 1 if total else 0} à {stop} sur {total}")
+
 
 # Configuration de la page
 st.set_page_config(
@@ -604,8 +3024,10 @@ except:
 # Initialisation des variables dans session_state
 if "df" not in st.session_state:
     st.session_state["df"] = None
-if "df_filtered" not in st.session_state:
-    st.session_state["df_filtered"] = None
+if "dataset" not in st.session_state:
+    st.session_state["dataset"] = None  # Copie de travail colonnaire du fichier chargé
+if "df_view" not in st.session_state:
+    st.session_state["df_view"] = None  # Vue nettoyée/filtrée de df (masque de lignes + transformations)
 if "db_path" not in st.session_state:
     st.session_state["db_path"] = None
 if "tables" not in st.session_state:
@@ -620,10 +3042,18 @@ if "show_filter_numeric" not in st.session_state:
     st.session_state["show_filter_numeric"] = False  # Affichage du filtre numérique
 if "current_page" not in st.session_state:
     st.session_state["current_page"] = "🏠 Accueil"
+if "filter_plan" not in st.session_state:
+    st.session_state["filter_plan"] = FilterPlan()  # Prédicats actifs sur la page Accueil
+if "engine" not in st.session_state:
+    st.session_state["engine"] = "pandas"  # Moteur de calcul choisi pour la session
 
 # Use the enhanced sidebar navigation instead of the original radio button
 page = create_enhanced_sidebar_navigation()
 
+# Choix du moteur de calcul (uniquement si DuckDB est installé)
+if len(ENGINES) > 1:
+    st.sidebar.selectbox("⚙️ Moteur de calcul", ENGINES, key="engine")
+
 # La section ci-dessous concerne uniquement la modification de la page d'accueil (🏠 Accueil)
 if page == "🏠 Accueil":
     # Titre avec animation et style amélioré
@@ -656,48 +3086,83 @@ if page == "🏠 Accueil":
         )
 
         if uploaded_file:
+            file_extension = uploaded_file.name.split(".")[-1].lower()
+            parse_options = {"extension": file_extension}
+
+            if file_extension == "csv":
+                parse_options["optimize"] = st.checkbox(
+                    "⚡ Import optimisé (lecture par blocs et types compacts)", value=True
+                )
+
             with st.spinner("Chargement des données en cours..."):
-                file_extension = uploaded_file.name.split(".")[-1]
-
-                if "df" not in st.session_state or st.session_state["df"] is None:
-                    if file_extension == "csv":
-                        df = pd.read_csv(uploaded_file)
-                    elif file_extension == "xlsx":
-                        df = pd.read_excel(uploaded_file)
-                    elif file_extension == "accdb":
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".accdb") as tmp_file:
-                            tmp_file.write(uploaded_file.read())
-                            st.session_state["db_path"] = tmp_file.name
+                content_hash = get_upload_hash(uploaded_file)
 
-                        conn_str = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={st.session_state['db_path']}"
-                        conn = pyodbc.connect(conn_str)
-                        cursor = conn.cursor()
+                if file_extension == "accdb":
+                    # La base n'est écrite sur disque qu'une fois par fichier téléversé
+                    if st.session_state.get("db_hash") != content_hash:
+                        # Libérer la base temporaire précédente de cette session
+                        if st.session_state.get("access_file") is not None:
+                            st.session_state["access_file"].release()
 
-                        st.session_state["tables"] = [
-                            table.table_name for table in cursor.tables(tableType="TABLE")
-                        ]
-                        selected_table = st.selectbox(
-                            "📑 Sélectionnez une table", st.session_state["tables"]
+                        with tempfile.NamedTemporaryFile(delete=False, suffix=".accdb") as tmp_file:
+                            tmp_file.write(uploaded_file.getbuffer())
+                            st.session_state["db_path"] = tmp_file.name
+                        st.session_state["db_hash"] = content_hash
+                        st.session_state["access_file"] = AccessSessionFile(
+                            st.session_state["db_path"], get_access_pool()
                         )
+                        st.session_state["tables"] = list_access_tables(st.session_state["db_path"])
 
-                        if selected_table:
-                            df = pd.read_sql(f"SELECT * FROM [{selected_table}]", conn)
+                    selected_table = st.selectbox(
+                        "📑 Sélectionnez une table", st.session_state["tables"]
+                    )
+                    parse_options["table"] = selected_table
 
-                        conn.close()
+                if file_extension != "accdb" or parse_options["table"]:
+                    dataset_key = build_dataset_key(content_hash, parse_options)
 
-                    st.session_state["df"] = df
-                    st.session_state["df_filtered"] = df.copy()
-                    st.success(f"✅ Fichier {uploaded_file.name} chargé avec succès!")
+                    # Nouveau fichier (ou nouvelle table) : on passe par le cache partagé
+                    if st.session_state.get("dataset_key") != dataset_key:
+                        loaded = get_dataset_cache().get_or_load(
+                            dataset_key,
+                            lambda: load_uploaded_dataset(
+                                uploaded_file, parse_options, dataset_key, st.session_state["db_path"]
+                            ),
+                        )
+                        # Les données sont partagées entre sessions : les pages ne les modifient jamais en place.
+                        # Avec une copie de travail, seule la poignée est gardée ; les pages y lisent leurs colonnes.
+                        st.session_state["dataset"] = loaded["dataset"]
+                        st.session_state["df"] = loaded["df"]
+                        # L'ancienne copie de travail de la session est libérée (évincée plus tard si inutilisée)
+                        hold_working_copies(
+                            "working_copies", [loaded["dataset"].path] if loaded["dataset"] is not None else []
+                        )
+                        st.session_state["df_view"] = DatasetView(read_session_columns(), dataset_key)
+                        st.session_state["dataset_key"] = dataset_key
+                        st.session_state["filter_plan"] = FilterPlan()
+                        st.session_state["ingest_report"] = loaded["report"]
+                        st.success(f"✅ Fichier {uploaded_file.name} chargé avec succès!")
 
     with col2:
         # Statistiques du jeu de données
-        if st.session_state["df"] is not None:
-            nb_lignes = len(st.session_state["df"])
-            nb_colonnes = len(st.session_state["df"].columns)
-            nb_valeurs_manquantes = st.session_state["df"].isna().sum().sum()
+        if has_session_data():
+            nb_lignes = session_num_rows()
+            nb_colonnes = len(session_columns())
+            nb_valeurs_manquantes = get_session_profile().missing_total
+
+            # Gain mémoire de l'import optimisé
+            report = st.session_state.get("ingest_report")
+            if report and report["before_bytes"] > 0:
+                saved = report["before_bytes"] - report["after_bytes"]
+                st.metric(
+                    "Mémoire utilisée",
+                    f"{report['after_bytes'] / 1024 ** 2:.1f} Mo",
+                    delta=f"-{saved / 1024 ** 2:.1f} Mo ({saved / report['before_bytes']:.0%})",
+                    delta_color="inverse",
+                )
 
     # Organisation des boutons d'actions dans la sidebar - UNIQUEMENT SI UN FICHIER EST CHARGÉ
-    if st.session_state["df"] is not None:
+    if has_session_data():
         # Affichage des actions disponibles seulement si un fichier est chargé
         st.sidebar.markdown(
             """
@@ -752,42 +3217,50 @@ if page == "🏠 Accueil":
                 "🔄 Remplacer valeurs manquantes par la moyenne"
             )
             cleaning_options["dropduplicates"] = st.sidebar.checkbox("📌 Supprimer les doublons")
+            if cleaning_options["dropduplicates"]:
+                cleaning_options["duplicate_subset"] = st.sidebar.multiselect(
+                    "🔑 Colonnes clés (toutes par défaut)", session_columns()
+                )
+                show_duplicate_report(
+                    st.sidebar,
+                    DatasetView(read_session_columns(), st.session_state["dataset_key"]),
+                    cleaning_options,
+                    st.session_state["engine"],
+                )
             cleaning_options["normalize"] = st.sidebar.checkbox(
                 "📊 Normaliser les données numériques"
             )
 
+            compare_engines = st.session_state["engine"] == "DuckDB" and st.sidebar.checkbox(
+                "🔍 Comparer avec pandas", key="compare_cleaning"
+            )
+
             apply_cleaning_clicked = st.sidebar.button(
                 "✅ Appliquer le nettoyage", key="apply_cleaning"
             )
 
             if apply_cleaning_clicked:
                 with st.spinner("Nettoyage en cours..."):
-                    df_filtered = st.session_state["df"].copy()
-
-                    if cleaning_options["dropna"]:
-                        df_filtered.dropna(inplace=True)
-
-                    if cleaning_options["fillna"]:
-                        numeric_cols = df_filtered.select_dtypes(
-                            include=["float64", "int64"]
-                        ).columns
-                        for col in numeric_cols:
-                            df_filtered[col] = df_filtered[col].fillna(df_filtered[col].mean())
-
-                    if cleaning_options["dropduplicates"]:
-                        df_filtered.drop_duplicates(inplace=True)
-
-                    if cleaning_options["normalize"]:
-                        numeric_cols = df_filtered.select_dtypes(
-                            include=["float64", "int64"]
-                        ).columns
-                        for col in numeric_cols:
-                            min_val = df_filtered[col].min()
-                            max_val = df_filtered[col].max()
-                            if max_val > min_val:  # Éviter la division par zéro
-                                df_filtered[col] = (df_filtered[col] - min_val) / (max_val - min_val)
-
-                    st.session_state["df_filtered"] = df_filtered
+                    df_view = run_cleaning_pipeline(
+                        DatasetView(read_session_columns(), st.session_state["dataset_key"]),
+                        cleaning_options,
+                        st.session_state["engine"],
+                    )
+
+                    # Profil dérivé de celui des données d'origine : seules les colonnes modifiées sont recalculées
+                    base_profile = get_session_profile()
+                    get_dataset_profile(
+                        None,
+                        df_view.version,
+                        lambda: profile_after_cleaning(base_profile, df_view, cleaning_options),
+                    )
+
+                    if compare_engines:
+                        show_engine_comparison(
+                            df_view.frame(), clean_dataframe_pandas(read_session_columns(), cleaning_options)
+                        )
+
+                    st.session_state["df_view"] = df_view
                     st.success("✅ Nettoyage appliqué avec succès!")
 
         # Filtrage par catégories
@@ -801,15 +3274,14 @@ if page == "🏠 Accueil":
                 unsafe_allow_html=True,
             )
 
-            df_filtered = st.session_state["df"].copy()
-            cat_columns = df_filtered.select_dtypes(include=["object", "category"]).columns
+            df = read_session_columns()
+            profile = get_session_profile()
+            cat_columns = df.select_dtypes(include=["object", "category"]).columns
             filter_changes = False
             category_filters = {}
 
             for col in cat_columns:
-                category_filters[col] = st.sidebar.multiselect(
-                    f"📌 {col}", df_filtered[col].dropna().unique()
-                )
+                category_filters[col] = category_picker(st.sidebar, f"📌 {col}", profile, col)
                 if category_filters[col]:
                     filter_changes = True
 
@@ -820,11 +3292,11 @@ if page == "🏠 Accueil":
 
                 if apply_cat_filters_clicked:
                     # Appliquer les filtres
-                    for col, values in category_filters.items():
-                        if values:
-                            df_filtered = df_filtered[df_filtered[col].isin(values)]
-
-                    st.session_state["df_filtered"] = df_filtered
+                    filter_plan = st.session_state["filter_plan"].with_category_filters(category_filters)
+                    st.session_state["filter_plan"] = filter_plan
+                    st.session_state["df_view"] = filter_plan.apply_view(
+                        DatasetView(df, st.session_state["dataset_key"]), st.session_state["engine"]
+                    )
                     st.success("✅ Filtres catégoriels appliqués!")
 
         # Filtrage par valeurs numériques
@@ -838,17 +3310,27 @@ if page == "🏠 Accueil":
                 unsafe_allow_html=True,
             )
 
-            df_filtered = st.session_state["df"].copy()
-            num_columns = df_filtered.select_dtypes(include=["int64", "float64"]).columns
+            df = read_session_columns()
+            profile = get_session_profile()
+            num_columns = df.select_dtypes(include="number").columns
             filter_changes = False
             numeric_filters = {}
 
             for col in num_columns:
-                min_val, max_val = float(df_filtered[col].min()), float(df_filtered[col].max())
+                min_val, max_val = profile.min_max(col)
                 if min_val < max_val:
                     numeric_filters[col] = st.sidebar.slider(
                         f"📏 {col}", min_val, max_val, (min_val, max_val)
                     )
+                    if numeric_filters[col] == (min_val, max_val):
+                        # Intervalle complet : toutes les valeurs renseignées, connues par le profil
+                        matching_rows = int(profile.columns[col]["count"])
+                    else:
+                        # Comptage instantané via l'index trié, construit pour ce seul curseur
+                        matching_rows = get_sorted_index(
+                            df[col], st.session_state["dataset_key"], col
+                        ).count(*numeric_filters[col])
+                    st.sidebar.caption(f"{matching_rows} lignes correspondantes")
                     filter_changes = True
 
             if filter_changes:
@@ -858,16 +3340,15 @@ if page == "🏠 Accueil":
 
                 if apply_num_filters_clicked:
                     # Appliquer les filtres
-                    for col, range_vals in numeric_filters.items():
-                        df_filtered = df_filtered[
-                            (df_filtered[col] >= range_vals[0]) & (df_filtered[col] <= range_vals[1])
-                        ]
-
-                    st.session_state["df_filtered"] = df_filtered
+                    filter_plan = st.session_state["filter_plan"].with_numeric_filters(numeric_filters)
+                    st.session_state["filter_plan"] = filter_plan
+                    st.session_state["df_view"] = filter_plan.apply_view(
+                        DatasetView(df, st.session_state["dataset_key"]), st.session_state["engine"]
+                    )
                     st.success("✅ Filtres numériques appliqués!")
 
     # Affichage des données avec un titre adaptatif et des métriques
-    if st.session_state["df"] is not None:
+    if has_session_data():
         container = st.container()
 
         if st.session_state["show_cleaning"]:
@@ -897,9 +3378,9 @@ if page == "🏠 Accueil":
             """, unsafe_allow_html=True,
             )
             # Métriques des données filtrées vs données originales
-        if st.session_state["df"] is not None and st.session_state["df_filtered"] is not None:
-            orig_rows = len(st.session_state["df"])
-            filtered_rows = len(st.session_state["df_filtered"])
+        if has_session_data() and st.session_state["df_view"] is not None:
+            orig_rows = session_num_rows()
+            filtered_rows = len(st.session_state["df_view"])
             percentage = (
                 round((filtered_rows / orig_rows) * 100, 1) if orig_rows > 0 else 0
             )
@@ -916,24 +3397,16 @@ if page == "🏠 Accueil":
         tab1, tab2 = st.tabs(["📋 Tableau de données", "📊 Résumé statistique"])
 
         with tab1:
-            # Option pour voir toutes les données ou limiter l'affichage
-            show_all = st.checkbox("Afficher toutes les lignes", value=False)
-
-            if show_all:
-                st.dataframe(st.session_state["df_filtered"], use_container_width=True)
-            else:
-                st.dataframe(st.session_state["df_filtered"].head(50), use_container_width=True)
-                st.info(
-                    f"Affichage limité aux 50 premières lignes. {len(st.session_state['df_filtered'])} lignes au total."
-                )
+            # Tableau paginé : seule la page affichée de la vue est matérialisée
+            show_data_grid(st.session_state["df_view"], "home_grid")
 
         with tab2:
-            if not st.session_state["df_filtered"].empty:
-                st.write(st.session_state["df_filtered"].describe())
+            if not st.session_state["df_view"].empty:
+                show_statistics_summary(st.session_state["df_view"], "home_stats_mode")
 
                 # Informations sur les types de données
                 st.markdown("#### Types de données:")
-                dtypes = st.session_state["df_filtered"].dtypes.reset_index()
+                dtypes = st.session_state["df_view"].dtypes.reset_index()
                 dtypes.columns = ["Colonne", "Type"]
                 st.dataframe(dtypes, use_container_width=True)
             else:
@@ -947,36 +3420,182 @@ if page == "🔀 Fusion":
     st.title("🔀 Fusion et Nettoyage de Données")
     
     if st.session_state["db_path"]:
-        conn_str = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={st.session_state['db_path']}"
-        conn = pyodbc.connect(conn_str)
-        cursor = conn.cursor()
-        
         # Sélection des tables
         selected_tables = st.multiselect("Sélectionnez les tables à combiner", st.session_state["tables"])
         
         combined_df = pd.DataFrame()
         selected_columns = {}
+        merge_spec = []
+        combined_rows = None
+        combined_origins = {}
+        combined_columns = []
+        combined_source = None
+        merged_dataset = None
+        merge_files = []
+
+        # Fusion hors mémoire : partitions sur disque et résultat dans un fichier Arrow
+        out_of_core = pa is not None and st.checkbox("💾 Fusion hors mémoire (partitions sur disque)")
+        if out_of_core:
+            spill_budget_mb = st.number_input(
+                "Budget mémoire par paire de partitions (Mo)", 16, 65536, SPILL_DEFAULT_BUDGET_MB, step=64
+            )
         
         if selected_tables:
+            db_path = st.session_state["db_path"]
+            db_mtime = os.path.getmtime(db_path)
             for table in selected_tables:
-                df_temp = pd.read_sql(f"SELECT * FROM [{table}]", conn)
-                columns = st.multiselect(f"Sélectionnez les colonnes de {table}", df_temp.columns, key=table)
+                # Seul le catalogue est lu : les lignes arrivent après le choix des colonnes et filtres
+                column_types = dict(get_access_columns(db_path, table, db_mtime))
+                columns = st.multiselect(f"Sélectionnez les colonnes de {table}", list(column_types), key=table)
                 if columns:
                     selected_columns[table] = columns
-                    if combined_df.empty:
-                        combined_df = df_temp[columns]
+                    category_filters = {}
+                    numeric_filters = {}
+
+                    with st.expander(f"🎛️ Filtres appliqués dans la requête ({table})"):
+                        for col in columns:
+                            if column_types[col] in ACCESS_TEXT_TYPES:
+                                values, truncated = get_access_distinct(db_path, table, col, db_mtime)
+                                category_filters[col] = st.multiselect(
+                                    f"📌 {col}", values, key=f"{table}_{col}_values"
+                                )
+                                if truncated:
+                                    st.caption(
+                                        f"Plus de {ACCESS_DISTINCT_LIMIT} valeurs distinctes : "
+                                        f"seules les {ACCESS_DISTINCT_LIMIT} premières sont proposées."
+                                    )
+                            elif column_types[col] in ACCESS_NUMERIC_TYPES:
+                                min_val, max_val = get_access_range(db_path, table, col, db_mtime)
+                                if min_val is not None and float(min_val) < float(max_val):
+                                    min_val, max_val = float(min_val), float(max_val)
+                                    selected_range = st.slider(
+                                        f"📏 {col}", min_val, max_val, (min_val, max_val),
+                                        key=f"{table}_{col}_range",
+                                    )
+                                    if selected_range != (min_val, max_val):
+                                        numeric_filters[col] = selected_range
+
+                    # Lignes triées sur toutes les colonnes triables de la table : leur ordre ne dépend pas des
+                    # colonnes choisies, et les codes de clés positionnels restent valables quand celles-ci changent
+                    order_by = [col for col, type_name in column_types.items() if type_name in ACCESS_ORDER_TYPES]
+                    table_query = build_access_query(table, columns, category_filters, numeric_filters, order_by)
+                    merge_spec.append((table, table_query))
+                    # Lignes de la table : table + filtres + tri (sans tri possible, la requête exacte)
+                    rows_query = build_access_query(
+                        table, None if order_by else columns, category_filters, numeric_filters, order_by
+                    )
+                    table_rows = derive_version(db_path, db_mtime, rows_query)
+                    if out_of_core:
+                        # Rien n'est chargé ici : la table est relue par morceaux au moment de la fusion
+                        table_source = access_source(db_path, table, columns, category_filters, numeric_filters)
                     else:
-                        combined_df = pd.concat([combined_df, df_temp[columns]], axis=1)
+                        df_temp = read_access_table(
+                            db_path, table, columns, category_filters, numeric_filters, order_by
+                        )[columns]
+                    table_origins = {col: (table_rows, col) for col in columns}
+                    if not combined_rows:
+                        if out_of_core:
+                            combined_source = table_source
+                        else:
+                            combined_df = df_temp
+                        combined_columns = list(columns)
+                        combined_rows = table_rows
+                        combined_origins = table_origins
+                        continue
+
+                    join_labels = [label for label, how in JOIN_TYPES.items() if how is not None or not out_of_core]
+                    join_label = st.selectbox(f"Type de fusion avec {table}", join_labels, key=f"{table}_join_type")
+                    how = JOIN_TYPES[join_label]
+                    if how is None:
+                        combined_df = pd.concat([combined_df, df_temp], axis=1)
+                        combined_columns = list(combined_df.columns)
+                        combined_rows = derive_version(combined_rows, "concat", table_rows)
+                        combined_origins = {**combined_origins, **table_origins}
+                        continue
+
+                    left_col, right_col = st.columns(2)
+                    left_keys = left_col.multiselect(
+                        "Clés des données combinées", combined_columns, key=f"{table}_join_left_keys"
+                    )
+                    right_keys = right_col.multiselect(f"Clés de {table}", columns, key=f"{table}_join_right_keys")
+                    if not left_keys or len(left_keys) != len(right_keys):
+                        st.info(f"Choisissez autant de clés de chaque côté pour fusionner {table}.")
+                        merge_spec.pop()
+                        continue
+
+                    if out_of_core:
+                        merge_spec.append((how, tuple(left_keys), tuple(right_keys)))
+                        with st.spinner(f"Fusion partitionnée avec {table}..."):
+                            merged_dataset, partitions = spill_join(
+                                combined_source, combined_columns, tuple(left_keys),
+                                table_source, columns, tuple(right_keys),
+                                how, table,
+                                derive_version(db_path, db_mtime, tuple(merge_spec), "spill"),
+                                spill_budget_mb * 1024 ** 2,
+                            )
+                        if partitions is not None:
+                            st.caption(f"Fusion avec {table} : {partitions} partition(s) sur disque")
+                        merge_files.append(merged_dataset.path)
+                        combined_source = dataset_source(merged_dataset)
+                        combined_columns = merged_dataset.columns
+                        continue
+
+                    # Codes réutilisés tant que les lignes et les clés ne changent pas (autres colonnes indifférentes)
+                    left_origins = tuple(combined_origins[key] for key in left_keys)
+                    left_codes, right_codes = factorize_join_keys(
+                        combined_df, derive_version(combined_rows, left_origins), tuple(left_keys),
+                        df_temp, table_rows, tuple(right_keys),
+                    )
+                    estimate = estimate_join(combined_df, df_temp, left_codes, right_codes, how)
+                    st.caption(
+                        f"Résultat estimé : {estimate['rows']:,} lignes, ~{estimate['bytes'] / 1024 ** 2:.1f} Mo "
+                        f"(table construite sur le côté de {min(len(combined_df), len(df_temp)):,} lignes)"
+                    )
+                    if estimate["bytes"] > DATASET_CACHE_MAX_BYTES:
+                        st.warning(
+                            "⚠️ Le résultat estimé dépasse le budget mémoire : vérifiez les clés de fusion "
+                            "ou activez la fusion hors mémoire."
+                        )
+                        merge_spec.pop()
+                        continue
+
+                    combined_origins = {
+                        **combined_origins,
+                        **{joined_column_name(col, combined_df.columns, table): (table_rows, col) for col in columns},
+                    }
+                    combined_df = hash_join(combined_df, df_temp, left_codes, right_codes, how, table)
+                    combined_columns = list(combined_df.columns)
+                    combined_rows = derive_version(combined_rows, how, left_origins, table_rows, tuple(right_keys))
+                    merge_spec.append((how, tuple(left_keys), tuple(right_keys)))
+
+            if out_of_core and combined_source is not None:
+                if merged_dataset is None:
+                    merged_dataset = spill_copy(
+                        combined_source, combined_columns, derive_version(db_path, db_mtime, tuple(merge_spec), "spill")
+                    )
+                    merge_files.append(merged_dataset.path)
+                # Seule la poignée est gardée : les pages lisent leurs colonnes dans le fichier Arrow
+                combined_df = None
+            # Fichiers de la fusion courante (étapes intermédiaires comprises, réutilisées aux reruns) ;
+            # ceux d'une fusion précédente sont libérés
+            hold_working_copies("merge_working_copies", merge_files)
             
             st.session_state["df_merged"] = combined_df
+            st.session_state["merged_dataset"] = merged_dataset
+            st.session_state["df_merged_version"] = derive_version(db_path, db_mtime, tuple(merge_spec), out_of_core)
             st.write("### Données combinées :")
-            st.dataframe(combined_df)
-        
-        conn.close()
+            show_data_grid(
+                DatasetView(read_dataset_columns(merged_dataset, combined_df), st.session_state["df_merged_version"]),
+                "merged_grid",
+            )
     
     # Nettoyage des données fusionnées
     if "df_merged" in st.session_state:
-        df_cleaned = st.session_state["df_merged"].copy()
+        cleaning_options = {}
+        merged_view = DatasetView(
+            read_dataset_columns(st.session_state.get("merged_dataset"), st.session_state["df_merged"]),
+            st.session_state.get("df_merged_version"),
+        )
         
         if st.sidebar.button("🧹 Nettoyage des Données"):
             st.session_state["show_cleaning_fusion"] = not st.session_state.get("show_cleaning_fusion", False)
@@ -991,77 +3610,105 @@ if page == "🔀 Fusion":
         if st.session_state.get("show_cleaning_fusion", False):
             st.subheader("🧹 Nettoyage des Données")
             if st.checkbox("Supprimer les valeurs manquantes"):
-                df_cleaned.dropna(inplace=True)
+                cleaning_options["dropna"] = True
                 st.write("✔️ Valeurs manquantes supprimées.")
                 
             if st.checkbox("Supprimer les doublons"):
-                df_cleaned.drop_duplicates(inplace=True)
-                st.write("✔️ Doublons supprimés.")
+                cleaning_options["dropduplicates"] = True
+                cleaning_options["duplicate_subset"] = st.multiselect(
+                    "Colonnes clés (toutes par défaut)", list(merged_view.columns)
+                )
+                show_duplicate_report(
+                    st,
+                    merged_view,
+                    cleaning_options,
+                    st.session_state["engine"],
+                )
             
-            numeric_cols = df_cleaned.select_dtypes(include=['float64', 'int64']).columns
-            if st.checkbox("Normaliser les données numériques") and len(numeric_cols) > 0:
-                df_cleaned[numeric_cols] = (df_cleaned[numeric_cols] - df_cleaned[numeric_cols].min()) / (df_cleaned[numeric_cols].max() - df_cleaned[numeric_cols].min())
+            if st.checkbox("Normaliser les données numériques"):
+                cleaning_options["normalize"] = True
                 st.write("✔️ Normalisation appliquée.")
         
+        # Mêmes étapes en cache que sur la page d'accueil ; le résultat est une vue des données fusionnées
+        filtered_view = run_cleaning_pipeline(
+            merged_view,
+            cleaning_options,
+            st.session_state["engine"],
+        )
+        
         # Filtrage dynamique
-        df_filtered = df_cleaned.copy()
         if st.session_state.get("show_filtering_fusion", False):
             st.subheader("🎛️ Filtrage des Données")
             
             if st.sidebar.button("Filtrer les catégories"):
-                cat_columns = df_filtered.select_dtypes(include=["object", "category"]).columns
+                cat_columns = filtered_view.head(0).select_dtypes(include=["object", "category"]).columns
+                profile = get_view_profile(filtered_view, cat_columns)
+                category_filters = {}
                 for col in cat_columns:
-                    selected_values = st.sidebar.multiselect(f"Filtrer {col}", df_filtered[col].dropna().unique())
-                    if selected_values:
-                        df_filtered = df_filtered[df_filtered[col].isin(selected_values)]
+                    category_filters[col] = category_picker(st.sidebar, f"Filtrer {col}", profile, col)
+                # Une seule intersection de bitmaps au lieu d'un isin par colonne
+                filtered_view = FilterPlan(category_filters).apply_view(filtered_view, st.session_state["engine"])
             
             if st.sidebar.button("Filtrer les nombres"):
-                num_columns = df_filtered.select_dtypes(include=["int64", "float64"]).columns
+                num_columns = filtered_view.numeric_columns()
+                profile = get_view_profile(filtered_view, num_columns)
+                numeric_filters = {}
                 for col in num_columns:
-                    min_val, max_val = float(df_filtered[col].min()), float(df_filtered[col].max())
+                    min_val, max_val = profile.min_max(col)
                     if min_val < max_val:
-                        selected_range = st.sidebar.slider(f"Filtrer {col}", min_val, max_val, (min_val, max_val))
-                        df_filtered = df_filtered[(df_filtered[col] >= selected_range[0]) & (df_filtered[col] <= selected_range[1])]
+                        numeric_filters[col] = st.sidebar.slider(f"Filtrer {col}", min_val, max_val, (min_val, max_val))
+                # Intervalles résolus par recherche dichotomique sur les index triés
+                filtered_view = FilterPlan(numeric_filters=numeric_filters).apply_view(filtered_view, st.session_state["engine"])
+        
+        # Rien n'est matérialisé ici : chaque graphique ne lit que les colonnes qu'il affiche
+        filtered_version = filtered_view.version
+        filtered_schema = filtered_view.head(0)
         
         st.write("### Données après Nettoyage et Filtrage :")
-        st.dataframe(df_filtered)
+        show_data_grid(filtered_view, "fusion_grid")
         
         # Résumé statistique
         st.subheader("📊 Résumé Statistique des Données Fusionnées :")
-        if not df_filtered.empty:
-            st.write(df_filtered.describe())
+        if not filtered_view.empty:
+            show_statistics_summary(filtered_view, "fusion_stats_mode")
         else:
             st.warning("Aucune donnée après nettoyage et filtrage.")
         
         # Visualisation des données fusionnées
         if st.session_state.get("show_visualization_fusion", False):
             st.subheader("📈 Visualisation des Données Fusionnées")
-            if not df_filtered.empty:
+            if not filtered_view.empty:
                 graph_type = st.selectbox("Choisissez un type de graphique", ["Histogramme", "Nuage de points", "Graphique en barres", "Camembert"])
                 
                 if graph_type == "Histogramme":
-                    column = st.selectbox("Sélectionnez une colonne numérique", df_filtered.select_dtypes(include=['int64', 'float64']).columns)
+                    column = st.selectbox("Sélectionnez une colonne numérique", filtered_schema.select_dtypes(include="number").columns)
                     if column:
-                        fig = px.histogram(df_filtered, x=column, nbins=30, title=f"Histogramme de {column}")
+                        counts, edges = cached_histogram(filtered_view.frame([column]), filtered_version, column)
+                        fig = go.Figure(histogram_bar_trace(counts, edges))
+                        fig.update_layout(title=f"Histogramme de {column}", xaxis_title=column,
+                                          yaxis_title="count", bargap=0)
                         st.plotly_chart(fig)
                 
                 elif graph_type == "Nuage de points":
-                    x_col = st.selectbox("Sélectionnez l'axe X", df_filtered.columns)
-                    y_col = st.selectbox("Sélectionnez l'axe Y", df_filtered.columns)
+                    x_col = st.selectbox("Sélectionnez l'axe X", filtered_schema.columns)
+                    y_col = st.selectbox("Sélectionnez l'axe Y", filtered_schema.columns)
                     if x_col and y_col:
-                        fig = px.scatter(df_filtered, x=x_col, y=y_col, title=f"Nuage de points : {x_col} vs {y_col}")
+                        fig = px.scatter(filtered_view.frame(list(dict.fromkeys([x_col, y_col]))), x=x_col, y=y_col, title=f"Nuage de points : {x_col} vs {y_col}")
                         st.plotly_chart(fig)
                 
                 elif graph_type == "Graphique en barres":
-                    column = st.selectbox("Sélectionnez une colonne catégorielle", df_filtered.select_dtypes(include=['object', 'category']).columns)
+                    column = st.selectbox("Sélectionnez une colonne catégorielle", filtered_schema.select_dtypes(include=['object', 'category']).columns)
                     if column:
-                        fig = px.bar(df_filtered[column].value_counts().reset_index(), x='index', y=column, title=f"Graphique en barres de {column}")
+                        counts = cached_value_counts(filtered_view.frame([column]), filtered_version, column, st.session_state["engine"])
+                        fig = px.bar(counts.reset_index(), x=column, y="count", title=f"Graphique en barres de {column}")
                         st.plotly_chart(fig)
                 
                 elif graph_type == "Camembert":
-                    column = st.selectbox("Sélectionnez une colonne catégorielle", df_filtered.select_dtypes(include=['object', 'category']).columns)
+                    column = st.selectbox("Sélectionnez une colonne catégorielle", filtered_schema.select_dtypes(include=['object', 'category']).columns)
+                    top_n = st.slider("Nombre de parts", 3, 30, PIE_TOP_N)
                     if column:
-                        fig = px.pie(df_filtered, names=column, title=f"Répartition de {column}")
+                        counts = top_n_counts(cached_value_counts(filtered_view.frame([column]), filtered_version, column, st.session_state["engine"]), top_n)
+                        fig = px.pie(counts.reset_index(), names=column, values="count", title=f"Répartition de {column}")
                         st.plotly_chart(fig)
             else:
                 st.warning("Aucune donnée disponible pour la visualisation.")
@@ -1069,12 +3716,12 @@ if page == "🔀 Fusion":
 if page == "📊 Visualisation":
     st.title("📊 Tableau de Bord Analytique")
     
-    if st.session_state["df"] is not None:
+    if has_session_data():
         # On vérifie d'abord le type de fichier chargé en session
         file_type = None
         if "db_path" in st.session_state and st.session_state["db_path"]:
             file_type = "access"
-        elif "df" in st.session_state and st.session_state["df"] is not None:
+        elif has_session_data():
             file_type = "excel_csv"
         
         df = None
@@ -1084,21 +3731,24 @@ if page == "📊 Visualisation":
             selected_table = st.sidebar.selectbox("Sélectionnez une table", st.session_state["tables"])
             
             if selected_table:
-                conn_str = f"DRIVER={{Microsoft Access Driver (*.mdb, *.accdb)}};DBQ={st.session_state['db_path']}"
-                conn = pyodbc.connect(conn_str)
-                df = pd.read_sql(f"SELECT * FROM [{selected_table}]", conn)
-                conn.close()
+                df = read_access_table(st.session_state["db_path"], selected_table)
+                df_version = derive_version(
+                    st.session_state["db_path"], os.path.getmtime(st.session_state["db_path"]), selected_table
+                )
         
         # Si fichier Excel ou CSV
         elif file_type == "excel_csv":
-            df = st.session_state["df"].copy()
+            df = read_session_columns()
+            df_version = st.session_state["dataset_key"]
             st.sidebar.info("Données chargées à partir d'un fichier Excel ou CSV")
         
         if df is not None:
+            profile = get_dataset_profile(df, df_version)
+            
             # Liste des colonnes disponibles pour les graphiques
             all_columns = df.columns.tolist()
-            num_columns = df.select_dtypes(include=['int64', 'float64']).columns.tolist()
-            cat_columns = df.select_dtypes(include=['object']).columns.tolist()
+            num_columns = df.select_dtypes(include="number").columns.tolist()
+            cat_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
             
             # Initialiser les variables avec des valeurs par défaut
             color_primary = "#1E3A8A"
@@ -1108,10 +3758,12 @@ if page == "📊 Visualisation":
             bar_x = cat_columns[0] if len(cat_columns) > 0 else "Aucune colonne"
             bar_y = num_columns[0] if len(num_columns) > 0 else "Aucune colonne"
             show_second_year = True
+            bar_agg = "Somme"
             second_y = num_columns[1] if len(num_columns) > 1 else None
             
             pie_col = cat_columns[0] if len(cat_columns) > 0 else "Aucune colonne"
             center_value = 45
+            pie_top_n = PIE_TOP_N
             
             line_x = all_columns[0] if len(all_columns) > 0 else "Aucune colonne"
             line_y = num_columns[:1] if len(num_columns) > 0 else []
@@ -1214,10 +3866,12 @@ if page == "📊 Visualisation":
                             st.session_state["selected_bar_x"] = dashboard["charts"]["bar"]["x"]
                             st.session_state["selected_bar_y"] = dashboard["charts"]["bar"]["y"]
                             st.session_state["selected_show_second"] = dashboard["charts"]["bar"]["show_second"]
+                            st.session_state["selected_bar_agg"] = dashboard["charts"]["bar"].get("agg", "Somme")
                             st.session_state["selected_second_y"] = dashboard["charts"]["bar"]["second_y"]
                             
                             st.session_state["selected_pie_col"] = dashboard["charts"]["pie"]["col"]
                             st.session_state["selected_center_value"] = dashboard["charts"]["pie"]["center_value"]
+                            st.session_state["selected_pie_top_n"] = dashboard["charts"]["pie"].get("top_n", PIE_TOP_N)
                             
                             st.session_state["selected_line_x"] = dashboard["charts"]["line"]["x"]
                             st.session_state["selected_line_y"] = dashboard["charts"]["line"]["y"]
@@ -1249,10 +3903,12 @@ if page == "📊 Visualisation":
                 bar_x = st.session_state["selected_bar_x"]
                 bar_y = st.session_state["selected_bar_y"]
                 show_second_year = st.session_state["selected_show_second"]
+                bar_agg = st.session_state["selected_bar_agg"]
                 second_y = st.session_state["selected_second_y"]
                 
                 pie_col = st.session_state["selected_pie_col"]
                 center_value = st.session_state["selected_center_value"]
+                pie_top_n = st.session_state["selected_pie_top_n"]
                 
                 line_x = st.session_state["selected_line_x"]
                 line_y = st.session_state["selected_line_y"]
@@ -1294,6 +3950,8 @@ if page == "📊 Visualisation":
                 bar_y = st.selectbox("Axe Y (Valeur)", 
                                     num_columns if len(num_columns) > 0 else ["Aucune colonne"],
                                     index=num_columns.index(bar_y) if bar_y in num_columns else 0)
+                bar_agg = st.selectbox("Agrégation", list(BAR_AGGREGATIONS),
+                                       index=list(BAR_AGGREGATIONS).index(bar_agg) if bar_agg in BAR_AGGREGATIONS else 0)
                 show_second_year = st.checkbox("Afficher une seconde série", value=show_second_year)
                 if show_second_year and len(num_columns) > 1:
                     second_y_options = [col for col in num_columns if col != bar_y]
@@ -1307,6 +3965,7 @@ if page == "📊 Visualisation":
                                       cat_columns if len(cat_columns) > 0 else ["Aucune colonne"],
                                       index=cat_columns.index(pie_col) if pie_col in cat_columns else 0)
                 center_value = st.slider("Valeur centrale (%)", 0, 100, center_value)
+                pie_top_n = st.slider("Nombre de parts", 3, 30, pie_top_n)
             
             # Tab 3: Graphique en ligne
             with graph_tabs[2]:
@@ -1379,11 +4038,13 @@ if page == "📊 Visualisation":
                             "x": bar_x,
                             "y": bar_y,
                             "show_second": show_second_year,
+                            "agg": bar_agg,
                             "second_y": second_y
                         },
                         "pie": {
                             "col": pie_col,
-                            "center_value": center_value
+                            "center_value": center_value,
+                            "top_n": pie_top_n
                         },
                         "line": {
                             "x": line_x,
@@ -1420,7 +4081,7 @@ if page == "📊 Visualisation":
             
             # Aperçu des données masqué par défaut mais accessible
             with st.expander("Aperçu des données"):
-                st.dataframe(df)
+                show_data_grid(DatasetView(df, df_version), "dashboard_grid")
             
             # Cartes récapitulatives en haut (en une seule ligne)
             col1, col2, col3, col4 = st.columns(4)
@@ -1444,7 +4105,9 @@ if page == "📊 Visualisation":
             with col3:
                 unique_count = 0
                 if len(cat_columns) > 0:
-                    unique_count = df[cat_columns[0]].nunique()
+                    unique_count = profile.nunique(cat_columns[0])
+                    if profile.is_approximate(cat_columns[0]):
+                        unique_count = f"≈{unique_count}"  # Estimation HyperLogLog
                 
                 st.markdown("""
                 <div style="background-color:white; padding:5px; border-radius:10px; border:1px solid #ddd; text-align:center;">
@@ -1456,7 +4119,7 @@ if page == "📊 Visualisation":
             with col4:
                 avg_value = 0
                 if len(num_columns) > 0:
-                    avg_value = round(df[num_columns[0]].mean(), 1)
+                    avg_value = round(profile.mean(num_columns[0]), 1)
                 
                 st.markdown("""
                 <div style="background-color:white; padding:5px; border-radius:10px; border:1px solid #ddd; text-align:center;">
@@ -1484,20 +4147,30 @@ if page == "📊 Visualisation":
                 st.markdown("<h5 style='color:#333; margin-top:0;'>Tendances</h5>", unsafe_allow_html=True)
                 
                 if len(num_columns) > 0 and len(cat_columns) > 0 and bar_x in df.columns and bar_y in df.columns:
-                    fig = px.bar(df, x=bar_x, y=bar_y, 
-                                 color_discrete_sequence=[color_primary],
-                                 template="plotly_white")
+                    show_second = show_second_year and second_y and second_y in df.columns and second_y != bar_y
+                    y_columns = (bar_y, second_y) if show_second else (bar_y,)
                     
-                    if show_second_year and second_y and second_y in df.columns:
-                        fig.add_bar(x=df[bar_x], y=df[second_y], 
-                                   name=second_y, marker_color=color_secondary)
-                        fig.update_layout(barmode='group')
+                    def build_bar_figure():
+                        # Agrégation côté serveur : une barre par catégorie
+                        bar_data = aggregate_bar_data(df, df_version, bar_x, y_columns,
+                                                      BAR_AGGREGATIONS[bar_agg], st.session_state["engine"])
+                        
+                        fig = px.bar(bar_data, x=bar_x, y=bar_y, template="plotly_white")
+                        
+                        if show_second:
+                            fig.add_bar(x=bar_data[bar_x], y=bar_data[second_y], name=second_y)
+                            fig.update_layout(barmode='group')
+                        
+                        fig.update_layout(
+                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                            margin=dict(l=10, r=10, t=10, b=10),
+                            height=smaller_height
+                        )
+                        return fig
                     
-                    fig.update_layout(
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        margin=dict(l=10, r=10, t=10, b=10),
-                        height=smaller_height
-                    )
+                    fig = cached_figure(("bar", df_version, bar_x, y_columns, bar_agg, st.session_state["engine"]),
+                                        build_bar_figure)
+                    color_traces(fig, [color_primary, color_secondary])
                     
                     st.plotly_chart(fig, use_container_width=True)
                     bar_fig = fig
@@ -1511,14 +4184,25 @@ if page == "📊 Visualisation":
                 st.markdown("<h5 style='color:#333; margin-top:0;'>Répartition</h5>", unsafe_allow_html=True)
                 
                 if len(cat_columns) > 0 and pie_col in df.columns:
-                    fig = px.pie(df, names=pie_col, hole=0.6,
-                                color_discrete_sequence=[color_primary, color_secondary, "#2D7DD2", "#97CC04"])
+                    def build_pie_figure():
+                        if profile.is_approximate(pie_col):
+                            pie_counts = top_n_sketch_counts(profile, pie_col, pie_top_n)
+                        else:
+                            pie_counts = top_n_counts(cached_value_counts(df, df_version, pie_col, st.session_state["engine"]), pie_top_n)
+                        fig = px.pie(pie_counts.reset_index(), names=pie_col, values="count", hole=0.6)
+                        
+                        fig.update_layout(
+                            margin=dict(l=10, r=10, t=10, b=10),
+                            height=smaller_height,
+                            showlegend=False  # Masquer la légende pour gagner de l'espace
+                        )
+                        return fig
                     
+                    fig = cached_figure(("pie", df_version, pie_col, pie_top_n, st.session_state["engine"]),
+                                        build_pie_figure)
+                    color_pie_slices(fig, [color_primary, color_secondary, "#2D7DD2", "#97CC04"])
                     fig.update_layout(
-                        annotations=[dict(text=f"{center_value}%", x=0.5, y=0.5, font_size=20, showarrow=False)],
-                        margin=dict(l=10, r=10, t=10, b=10),
-                        height=smaller_height,
-                        showlegend=False  # Masquer la légende pour gagner de l'espace
+                        annotations=[dict(text=f"{center_value}%", x=0.5, y=0.5, font_size=20, showarrow=False)]
                     )
                     
                     st.plotly_chart(fig, use_container_width=True)
@@ -1533,17 +4217,28 @@ if page == "📊 Visualisation":
                 st.markdown("<h5 style='color:#333; margin-top:0;'>Évolution</h5>", unsafe_allow_html=True)
                 
                 if len(line_y) > 0 and line_x in df.columns and all(col in df.columns for col in line_y):
-                    fig = px.line(df, x=line_x, y=line_y, 
-                                  color_discrete_sequence=[color_primary, color_secondary])
-                    
-                    for trace in fig.data:
-                        trace.mode = "lines+markers"
+                    def build_line_figure():
+                        if len(df) > LARGE_DATA_ROWS:
+                            # Réduction LTTB de chaque série puis rendu WebGL
+                            line_data = prepare_line_data(df, df_version, line_x, tuple(line_y), LINE_POINT_BUDGET)
+                            fig = px.line(line_data, x=line_x, y="value", color="variable", render_mode="webgl")
+                        else:
+                            fig = px.line(df, x=line_x, y=line_y)
+                        
+                        for trace in fig.data:
+                            trace.mode = "lines+markers"
+                        
+                        fig.update_layout(
+                            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+                            margin=dict(l=10, r=10, t=10, b=10),
+                            height=smaller_height
+                        )
+                        return fig
                     
-                    fig.update_layout(
-                        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                        margin=dict(l=10, r=10, t=10, b=10),
-                        height=smaller_height
-                    )
+                    fig = cached_figure(("line", df_version, line_x, tuple(line_y)), build_line_figure)
+                    color_traces(fig, [color_primary, color_secondary])
+                    if len(df) > LARGE_DATA_ROWS:
+                        show_reduction_caption(len(df) * len(line_y), shown_points(fig))
                     
                     st.plotly_chart(fig, use_container_width=True)
                     line_fig = fig
@@ -1564,16 +4259,33 @@ if page == "📊 Visualisation":
                                        bubble_size in df.columns and bubble_color in df.columns)
                 
                 if valid_bubble_columns:
-                    fig = px.scatter(df, x=bubble_x, y=bubble_y, 
-                                     size=bubble_size, 
-                                     color=bubble_color,
-                                     hover_name=cat_columns[0] if cat_columns else None,
-                                     color_discrete_sequence=px.colors.sequential.Viridis)
+                    def build_bubble_figure():
+                        bubble_data = df
+                        render_mode = "auto"
+                        if len(df) > LARGE_DATA_ROWS:
+                            # Échantillon par densité puis rendu WebGL
+                            bubble_columns = tuple(dict.fromkeys([bubble_x, bubble_y, bubble_size, bubble_color, cat_columns[0]]))
+                            bubble_data = sample_scatter_data(df, df_version, bubble_columns, bubble_x, bubble_y,
+                                                              SCATTER_POINT_BUDGET)
+                            render_mode = "webgl"
+                        
+                        fig = px.scatter(bubble_data, x=bubble_x, y=bubble_y, 
+                                         size=bubble_size, 
+                                         color=bubble_color,
+                                         hover_name=cat_columns[0] if cat_columns else None,
+                                         render_mode=render_mode,
+                                         color_discrete_sequence=px.colors.sequential.Viridis)
+                        
+                        fig.update_layout(
+                            margin=dict(l=10, r=10, t=10, b=10),
+                            height=smaller_height
+                        )
+                        return fig
                     
-                    fig.update_layout(
-                        margin=dict(l=10, r=10, t=10, b=10),
-                        height=smaller_height
-                    )
+                    fig = cached_figure(("bubble", df_version, bubble_x, bubble_y, bubble_size, bubble_color, cat_columns[0]),
+                                        build_bubble_figure)
+                    if len(df) > LARGE_DATA_ROWS:
+                        show_reduction_caption(len(df), shown_points(fig))
                     
                     st.plotly_chart(fig, use_container_width=True)
                     bubble_fig = fig
@@ -1587,19 +4299,27 @@ if page == "📊 Visualisation":
                 st.markdown("<h5 style='color:#333; margin-top:0;'>Distribution des Valeurs</h5>", unsafe_allow_html=True)
                 
                 if len(num_columns) > 0 and boxplot_col in df.columns:
-                    if group_by != "Aucun" and group_by in df.columns:
-                        fig = px.box(df, x=group_by, y=boxplot_col, 
-                                    color=group_by,
-                                    color_discrete_sequence=[color_primary, color_secondary, "#2D7DD2", "#97CC04"])
-                    else:
-                        fig = px.box(df, y=boxplot_col, 
-                                    color_discrete_sequence=[color_primary])
+                    grouped = group_by != "Aucun" and group_by in df.columns
                     
-                    fig.update_layout(
-                        margin=dict(l=10, r=10, t=10, b=10),
-                        height=smaller_height,
-                        showlegend=False  # Masquer la légende pour gagner de l'espace
-                    )
+                    def build_box_figure():
+                        if grouped:
+                            fig = box_figure(*box_statistics(df, df_version, boxplot_col, group_by))
+                            fig.update_layout(xaxis_title=group_by, yaxis_title=boxplot_col)
+                        else:
+                            fig = box_figure(*box_statistics(df, df_version, boxplot_col))
+                            fig.update_layout(yaxis_title=boxplot_col)
+                        
+                        fig.update_layout(
+                            margin=dict(l=10, r=10, t=10, b=10),
+                            height=smaller_height,
+                            showlegend=False  # Masquer la légende pour gagner de l'espace
+                        )
+                        return fig
+                    
+                    fig = cached_figure(("box", df_version, boxplot_col, group_by if grouped else None),
+                                        build_box_figure)
+                    color_traces(fig, [color_primary, color_secondary, "#2D7DD2", "#97CC04"] if grouped else [color_primary],
+                                 by_group=True)
                     
                     st.plotly_chart(fig, use_container_width=True)
                     box_fig = fig
@@ -1614,8 +4334,8 @@ if page == "📊 Visualisation":
 if page == "🤖 Prédiction":
     st.title("🤖 Modèles Prédictifs")
     
-    if st.session_state["df"] is not None:
-        df = st.session_state["df"].copy()
+    if has_session_data():
+        all_columns = session_columns()
         
         # Section de sélection des paramètres du modèle
         st.sidebar.markdown("## 🎛️ Paramètres du modèle")
@@ -1623,16 +4343,20 @@ if page == "🤖 Prédiction":
         # Sélection de la variable cible
         target_col = st.sidebar.selectbox(
             "📌 Variable cible (Y)",
-            df.columns
+            all_columns
         )
         
         # Sélection des caractéristiques
         feature_cols = st.sidebar.multiselect(
             "📊 Caractéristiques (X)",
-            [col for col in df.columns if col != target_col],
-            default=[col for col in df.columns if col != target_col][:3]  # Par défaut, sélectionner les 3 premières colonnes
+            [col for col in all_columns if col != target_col],
+            default=[col for col in all_columns if col != target_col][:3]  # Par défaut, sélectionner les 3 premières colonnes
         )
         
+        # Seules la cible et les caractéristiques sont lues
+        df = read_session_columns([target_col] + feature_cols)
+        profile = get_session_profile()
+        
         # Option pour le traitement des valeurs catégorielles
         handle_categorical = st.sidebar.checkbox("Encoder les variables catégorielles", value=True)
         
@@ -1660,7 +4384,7 @@ if page == "🤖 Prédiction":
         </div>
         """, unsafe_allow_html=True)
         
-        st.dataframe(df.head())
+        st.dataframe(read_session_columns().head())
         
         # Section: Préparation des données
         st.markdown("""
@@ -1675,9 +4399,9 @@ if page == "🤖 Prédiction":
             st.markdown(f"**Variable cible**: {target_col}")
             if target_col in df.columns:
                 if pd.api.types.is_numeric_dtype(df[target_col].dtype):
-                    st.write(f"Type: Numérique (moyenne: {df[target_col].mean():.2f})")
+                    st.write(f"Type: Numérique (moyenne: {profile.mean(target_col):.2f})")
                 else:
-                    st.write(f"Type: Catégoriel ({len(df[target_col].unique())} catégories)")
+                    st.write(f"Type: Catégoriel ({profile.nunique(target_col)} catégories)")
         
         with col2:
             st.markdown(f"**Caractéristiques**: {len(feature_cols)} sélectionnées")
@@ -1750,7 +4474,8 @@ if page == "🤖 Prédiction":
                     # Afficher les erreurs de prédiction
                     errors = y_true - y_pred
                     fig_error = go.Figure()
-                    fig_error.add_trace(go.Histogram(x=errors, marker_color='red'))
+                    error_counts, error_edges = compute_histogram(errors)
+                    fig_error.add_trace(histogram_bar_trace(error_counts, error_edges, marker_color='red'))
                     
                     fig_error.update_layout(
                         title="Distribution des erreurs",
@@ -1839,9 +4564,8 @@ if page == "🤖 Prédiction":
                         if feature in df.columns:
                             if pd.api.types.is_numeric_dtype(df[feature].dtype):
                                 # Pour les caractéristiques numériques
-                                min_val = float(df[feature].min())
-                                max_val = float(df[feature].max())
-                                default_val = float(df[feature].mean())
+                                min_val, max_val = profile.min_max(feature)
+                                default_val = profile.mean(feature)
                                 
                                 prediction_inputs[feature] = st.number_input(
                                     f"{feature}",
@@ -1852,7 +4576,7 @@ if page == "🤖 Prédiction":
                                 )
                             else:
                                 # Pour les caractéristiques catégorielles
-                                options = df[feature].unique().tolist()
+                                options = profile.uniques(feature)
                                 prediction_inputs[feature] = st.selectbox(
                                     f"{feature}",
                                     options=options
@@ -1867,9 +4591,8 @@ if page == "🤖 Prédiction":
                             if feature in df.columns:
                                 if pd.api.types.is_numeric_dtype(df[feature].dtype):
                                     # Pour les caractéristiques numériques
-                                    min_val = float(df[feature].min())
-                                    max_val = float(df[feature].max())
-                                    default_val = float(df[feature].mean())
+                                    min_val, max_val = profile.min_max(feature)
+                                    default_val = profile.mean(feature)
                                     
                                     prediction_inputs[feature] = st.number_input(
                                         f"{feature}",
@@ -1880,7 +4603,7 @@ if page == "🤖 Prédiction":
                                     )
                                 else:
                                     # Pour les caractéristiques catégorielles
-                                    options = df[feature].unique().tolist()
+                                    options = profile.uniques(feature)
                                     prediction_inputs[feature] = st.selectbox(
                                         f"{feature}",
                                         options=options
@@ -1893,14 +4616,15 @@ if page == "🤖 Prédiction":
                         
                         # Simulation d'une prédiction (dans une application réelle, utiliser le modèle entraîné)
                         if model_type == "Régression linéaire":
-                            prediction_value = np.random.normal(df[target_col].mean(), df[target_col].std() / 3, 1)[0]
+                            prediction_value = np.random.normal(profile.mean(target_col), profile.columns[target_col]["std"] / 3, 1)[0]
                             
                             st.success(f"**Prédiction**: {prediction_value:.2f}")
                             
                             # Afficher où se situe la prédiction dans la distribution des valeurs
                             fig_dist = go.Figure()
-                            fig_dist.add_trace(go.Histogram(x=df[target_col], name="Distribution", marker_color="blue", opacity=0.7))
-                            fig_dist.add_trace(go.Scatter(x=[prediction_value, prediction_value], y=[0, df[target_col].value_counts().max() / 2],
+                            target_counts, target_edges = cached_histogram(df, st.session_state["dataset_key"], target_col)
+                            fig_dist.add_trace(histogram_bar_trace(target_counts, target_edges, name="Distribution", marker_color="blue", opacity=0.7))
+                            fig_dist.add_trace(go.Scatter(x=[prediction_value, prediction_value], y=[0, target_counts.max() / 2],
                                             mode="lines", name="Prédiction", line=dict(color="red", width=3, dash="dash")))
                             
                             fig_dist.update_layout(
@@ -1914,7 +4638,7 @@ if page == "🤖 Prédiction":
                             
                         else:  # Pour les modèles de classification
                             # Simulation d'une classification avec probabilités
-                            classes = ["Classe A", "Classe B"] if len(df[target_col].unique()) <= 2 else ["Classe A", "Classe B", "Classe C"]
+                            classes = ["Classe A", "Classe B"] if profile.nunique(target_col) <= 2 else ["Classe A", "Classe B", "Classe C"]
                             probs = np.random.dirichlet(np.ones(len(classes)), size=1)[0]
                             predicted_class = classes[np.argmax(probs)]
                             